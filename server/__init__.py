@@ -1,6 +1,7 @@
 import asyncio
 import logging
 
+import logs
 from tradecore import TradeController
 
 _LOGGER = logging.getLogger("main")
@@ -8,12 +9,11 @@ _LOGGER.setLevel(logging.DEBUG)
 
 
 async def _boostrap():
-    _LOGGER.info("pandora boostrap...")
-
-    logging.basicConfig(level=logging.DEBUG)
-
+    # logging pipeline is installed from config.json by the controller
     await TradeController().setup()
 
+    _LOGGER.info("pandora boostrap...")
+
 
 async def main():
 
@@ -21,11 +21,11 @@ async def main():
 
     control = TradeController()
 
-    while True:
-        control.execute()
-        await asyncio.sleep(0.1)
-
-    await control.release()
+    try:
+        await control.run()
+    finally:
+        await control.release()
+        logs.shutdown()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,5 @@
+from .engine import (Backtest, BacktestResult, align, forward_fill,
+                     from_columns, load_klines)
+
+__all__ = ["Backtest", "BacktestResult", "align", "forward_fill",
+           "from_columns", "load_klines"]
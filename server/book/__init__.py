@@ -0,0 +1,5 @@
+from .ladder import PriceLadder
+from .l2 import L2OrderBook
+from .l3 import L3Order, L3OrderBook
+
+__all__ = ["PriceLadder", "L2OrderBook", "L3Order", "L3OrderBook"]
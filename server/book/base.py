@@ -0,0 +1,136 @@
+import asyncio
+import logging
+
+_LOGGER = logging.getLogger("book")
+_LOGGER.setLevel(logging.DEBUG)
+
+# drop buffered messages and reload the snapshot beyond this
+MAX_PENDING = 10000
+
+
+def _sequence(data):
+    return data["sequence"]
+
+
+class SequencedBook:
+    """Order book kept in sync by sequenced websocket messages
+
+    Messages received while the snapshot loads or a gap is being filled are
+    buffered and replayed in sequence order. Subclasses implement
+    `_subscribe`, `_fetch_snapshot`, `_fetch_messages`, `_reset` and `_apply`.
+    """
+
+    level = ""
+
+    def __init__(self, exchange, symbol):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.sequence = 0
+        self.ready = False
+        self.on_update = None
+        self.handle = None
+        self._pending = []
+        self._recovering = False
+
+    async def start(self):
+        """Subscribe messages and load the snapshot"""
+        self._recovering = True
+        self.handle = await self._subscribe(self._on_message)
+        await self._recover(0)
+
+    def stop(self):
+        if self.handle:
+            self.handle.unsubscribe()
+            self.handle = None
+        self.ready = False
+
+    async def _subscribe(self, cb):
+        raise NotImplementedError
+
+    async def _fetch_snapshot(self):
+        raise NotImplementedError
+
+    async def _fetch_messages(self, start, end):
+        raise NotImplementedError
+
+    def _reset(self, snapshot):
+        """Rebuild the book from a snapshot"""
+        raise NotImplementedError
+
+    def _apply(self, data):
+        """Apply one in-order message"""
+        raise NotImplementedError
+
+    def _step(self, data):
+        """Apply one message, return False on sequence gap"""
+        seq = data["sequence"]
+        if seq <= self.sequence:
+            return True
+        if seq != self.sequence + 1:
+            return False
+        self._apply(data)
+        self.sequence = seq
+        return True
+
+    def _on_message(self, msg_type, content):
+        data = content["data"]
+        if self._recovering:
+            self._pending.append(data)
+            if len(self._pending) > MAX_PENDING:
+                self._pending.clear()
+                self.sequence = 0
+            return
+
+        if not self._step(data):
+            self._pending.append(data)
+            self._schedule_recover(data["sequence"] - 1)
+            return
+
+        if self.on_update:
+            self.on_update(self)
+
+    def _schedule_recover(self, end):
+        if self._recovering:
+            return
+        self._recovering = True
+        self.ready = False
+        asyncio.ensure_future(self._recover(end))
+
+    async def _recover(self, end):
+        try:
+            if self.sequence and end > self.sequence:
+                try:
+                    messages = await self._fetch_messages(self.sequence + 1, end)
+                    for data in sorted(messages or (), key=_sequence):
+                        self._step(data)
+                except Exception as e:
+                    _LOGGER.error("%s %s gap %s-%s fill failed: %s", self.symbol,
+                                  self.level, self.sequence + 1, end, e)
+
+            if not self.sequence or self.sequence < end:
+                snapshot = await self._fetch_snapshot()
+                self._reset(snapshot)
+                self.sequence = snapshot["sequence"]
+                _LOGGER.info("%s %s snapshot loaded at %s",
+                             self.symbol, self.level, self.sequence)
+        except Exception as e:
+            _LOGGER.error("%s %s snapshot failed: %s", self.symbol, self.level, e)
+            await asyncio.sleep(1)
+            self._recovering = False
+            self._schedule_recover(end)
+            return
+
+        self._recovering = False
+        self._drain()
+
+    def _drain(self):
+        pending, self._pending = self._pending, []
+        pending.sort(key=_sequence)
+        for index, data in enumerate(pending):
+            if not self._step(data):
+                self._pending = pending[index:]
+                self._schedule_recover(data["sequence"] - 1)
+                return
+        self.ready = True
+        if self.on_update:
+            self.on_update(self)
@@ -0,0 +1,79 @@
+from .base import SequencedBook
+from .ladder import PriceLadder
+
+
+class L2OrderBook(SequencedBook):
+    """Local level-2 order book
+
+    Loaded from `/api/v1/level2/snapshot` and kept up to date with
+    `/contractMarket/level2` deltas. Sequence gaps are filled through
+    `get_l2_messages`, falling back to a fresh snapshot.
+    """
+
+    level = "l2"
+
+    def __init__(self, exchange, symbol):
+        super(L2OrderBook, self).__init__(exchange, symbol)
+        self.bids = PriceLadder(descending=True)
+        self.asks = PriceLadder()
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def spread(self):
+        if not self.bids.keys or not self.asks.keys:
+            return None
+        return self.asks.keys[0] + self.bids.keys[0]
+
+    def mid(self):
+        if not self.bids.keys or not self.asks.keys:
+            return None
+        return (self.asks.keys[0] - self.bids.keys[0]) / 2
+
+    def depth(self, side, levels):
+        """Total size of the top levels
+
+        Args:
+            side: buy or sell
+            levels: price level count
+        """
+        return (self.bids if side == "buy" else self.asks).depth(levels)
+
+    def vwap(self, side, qty):
+        """Average fill price for a market order of `qty`
+
+        Args:
+            side: buy takes the asks, sell takes the bids
+            qty: order size
+
+        Returns:
+            (avg_price, filled)
+        """
+        return (self.asks if side == "buy" else self.bids).vwap(qty)
+
+    async def _subscribe(self, cb):
+        return await self.exchange.sub_level2(self.symbol, cb)
+
+    async def _fetch_snapshot(self):
+        return await self.exchange.l2_order_book(self.symbol)
+
+    async def _fetch_messages(self, start, end):
+        return await self.exchange.get_l2_messages(self.symbol, start, end)
+
+    def _reset(self, snapshot):
+        self.bids.clear()
+        self.asks.clear()
+        for price, size in snapshot["bids"]:
+            self.bids.set(float(price), float(size))
+        for price, size in snapshot["asks"]:
+            self.asks.set(float(price), float(size))
+
+    def _apply(self, data):
+        price, side, size = data["change"].split(",")
+        if side == "buy":
+            self.bids.set(float(price), float(size))
+        else:
+            self.asks.set(float(price), float(size))
@@ -0,0 +1,137 @@
+from .base import SequencedBook
+from .ladder import PriceLadder
+
+
+class L3Order:
+    """Resting order in the level-3 book"""
+
+    __slots__ = ("order_id", "side", "price", "size", "ts", "queue")
+
+    def __init__(self, order_id, side, price, size, ts, queue):
+        self.order_id = order_id
+        self.side = side
+        self.price = price
+        self.size = size
+        self.ts = ts
+        self.queue = queue
+
+
+class L3OrderBook(SequencedBook):
+    """Order-by-order level-3 book
+
+    Each price level is a dict keyed by order id, insertion order being the
+    exchange queue priority. Together with the `orders` index this makes
+    open, change, match and done O(1) on the order itself. Aggregated size
+    per level is mirrored into `bids`/`asks` ladders for l2-style queries.
+    """
+
+    level = "l3"
+
+    def __init__(self, exchange, symbol):
+        super(L3OrderBook, self).__init__(exchange, symbol)
+        self.bids = PriceLadder(descending=True)
+        self.asks = PriceLadder()
+        self.orders = {}
+        self.own = set()
+        self._queues = ({}, {})      # buy, sell: price -> {order_id: L3Order}
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def track(self, order_id):
+        """Follow queue position of one of our resting orders"""
+        self.own.add(order_id)
+
+    def untrack(self, order_id):
+        self.own.discard(order_id)
+
+    def queue_position(self, order_id):
+        """Estimate queue position of a resting order
+
+        Returns:
+            (orders_ahead, size_ahead) or None when the order is not resting
+        """
+        order = self.orders.get(order_id)
+        if order is None:
+            return None
+        ahead = 0
+        size = 0
+        for oid, other in order.queue.items():
+            if oid == order_id:
+                break
+            ahead += 1
+            size += other.size
+        return ahead, size
+
+    def own_positions(self):
+        """Yields:
+            (order_id, orders_ahead, size_ahead) for tracked resting orders
+        """
+        for order_id in self.own:
+            position = self.queue_position(order_id)
+            if position is not None:
+                yield (order_id,) + position
+
+    async def _subscribe(self, cb):
+        return await self.exchange.sub_level3(self.symbol, cb)
+
+    async def _fetch_snapshot(self):
+        return await self.exchange.l3_order_book(self.symbol)
+
+    async def _fetch_messages(self, start, end):
+        return await self.exchange.get_l3_messages(self.symbol, start, end)
+
+    def _reset(self, snapshot):
+        self.bids.clear()
+        self.asks.clear()
+        self.orders.clear()
+        for queues in self._queues:
+            queues.clear()
+        for side, rows in (("buy", snapshot["bids"]), ("sell", snapshot["asks"])):
+            for ts, order_id, price, size, _ in rows:
+                self._open(order_id, side, float(price), float(size), ts)
+
+    def _open(self, order_id, side, price, size, ts):
+        queues = self._queues[side != "buy"]
+        queue = queues.get(price)
+        if queue is None:
+            queue = queues[price] = {}
+        order = L3Order(order_id, side, price, size, ts, queue)
+        queue[order_id] = order
+        self.orders[order_id] = order
+        ladder = self.bids if side == "buy" else self.asks
+        ladder.set(price, ladder.get(price) + size)
+
+    def _resize(self, order, size):
+        ladder = self.bids if order.side == "buy" else self.asks
+        ladder.set(order.price, ladder.get(order.price) + size - order.size)
+        order.size = size
+
+    def _remove(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return
+        self._resize(order, 0)
+        queue = order.queue
+        del queue[order_id]
+        if not queue:
+            del self._queues[order.side != "buy"][order.price]
+
+    def _apply(self, data):
+        msg_type = data["type"]
+        if msg_type == "open":
+            self._open(data["orderId"], data["side"], float(data["price"]),
+                       float(data["size"]), data.get("ts", 0))
+        elif msg_type == "done":
+            self._remove(data["orderId"])
+        elif msg_type == "match":
+            order = self.orders.get(data["makerOrderId"])
+            if order is not None:
+                self._resize(order, max(order.size - float(data["size"]), 0.0))
+        elif msg_type in ("change", "update"):
+            order = self.orders.get(data["orderId"])
+            if order is not None:
+                self._resize(order, float(data.get("newSize", data.get("size"))))
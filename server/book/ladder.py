@@ -0,0 +1,96 @@
+from bisect import bisect_left, insort
+
+
+class PriceLadder:
+    """One side of an order book
+
+    Prices are kept in a sorted list, bids are stored negated so both sides
+    share the same ascending layout and the best price is always `keys[0]`.
+    Queries walk the list and return tuples, no dict is built per call.
+    """
+
+    __slots__ = ("sign", "keys", "sizes")
+
+    def __init__(self, descending=False):
+        self.sign = -1.0 if descending else 1.0
+        self.keys = []
+        self.sizes = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def clear(self):
+        self.keys.clear()
+        self.sizes.clear()
+
+    def set(self, price, size):
+        """Set aggregated size at price, size 0 removes the level"""
+        key = price * self.sign
+        sizes = self.sizes
+        if size:
+            if key not in sizes:
+                insort(self.keys, key)
+            sizes[key] = size
+        elif key in sizes:
+            del sizes[key]
+            keys = self.keys
+            del keys[bisect_left(keys, key)]
+
+    def get(self, price):
+        return self.sizes.get(price * self.sign, 0)
+
+    def best(self):
+        """Returns:
+            (price, size) or None when the side is empty
+        """
+        if not self.keys:
+            return None
+        key = self.keys[0]
+        return key * self.sign, self.sizes[key]
+
+    def level(self, index):
+        key = self.keys[index]
+        return key * self.sign, self.sizes[key]
+
+    def depth(self, levels):
+        """Total size of the top `levels` price levels"""
+        sizes = self.sizes
+        total = 0
+        for key in self.keys[:levels]:
+            total += sizes[key]
+        return total
+
+    def depth_to(self, price):
+        """Total size at prices equal or better than `price`"""
+        sizes = self.sizes
+        end = bisect_left(self.keys, price * self.sign)
+        keys = self.keys
+        total = 0
+        for index in range(end):
+            total += sizes[keys[index]]
+        if end < len(keys) and keys[end] == price * self.sign:
+            total += sizes[keys[end]]
+        return total
+
+    def vwap(self, qty):
+        """Average price to take `qty` from this side
+
+        Returns:
+            (avg_price, filled), filled < qty when the side is too thin
+        """
+        sign = self.sign
+        sizes = self.sizes
+        remain = qty
+        notional = 0.0
+        for key in self.keys:
+            size = sizes[key]
+            if size >= remain:
+                notional += key * remain
+                remain = 0
+                break
+            notional += key * size
+            remain -= size
+        filled = qty - remain
+        if not filled:
+            return 0.0, 0
+        return notional * sign / filled, filled
@@ -6,3 +6,6 @@ REQUEST_PUT = 'PUT'
 EXCHANGE_KUMEX  = "KuMex"
 
 SPOT_CONTRACT = "spot_contract"
+
+SCHEDULE_POLL = "poll"
+SCHEDULE_EVENT = "event"
@@ -1,3 +1,5 @@
-from .exchange import ExchangeAbstract, SubscribeHandle
+from .clock import ExchangeClock
+from .dispatch import DispatchTable, SubscribeHandle
+from .exchange import ExchangeAbstract
 
-__all__ = ["ExchangeAbstract", "SubscribeHandle"]
+__all__ = ["DispatchTable", "ExchangeAbstract", "ExchangeClock", "SubscribeHandle"]
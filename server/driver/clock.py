@@ -0,0 +1,85 @@
+import asyncio
+import collections
+import logging
+import time
+
+_LOGGER = logging.getLogger("clock")
+_LOGGER.setLevel(logging.DEBUG)
+
+
+class ExchangeClock:
+    """Exchange time estimate
+
+    The server timestamp is sampled periodically. Each sample gives an
+    offset against the midpoint of its round trip, the sample with the
+    lowest round trip among the recent ones is trusted. Local time runs on
+    the monotonic clock anchored once to the wall clock, and the returned
+    exchange time never goes backwards.
+
+    Args:
+        sampler: coroutine function returning server time in milliseconds
+        interval: seconds between two samples
+        window: recent samples considered
+    """
+
+    def __init__(self, sampler, interval=30, window=8):
+        self.sampler = sampler
+        self.interval = interval
+        self.offset = 0.0           # exchange - local, ms
+        self.rtt = None             # ms of the trusted sample
+        self._samples = collections.deque(maxlen=window)
+        self._wall = time.time()
+        self._mono = time.monotonic()
+        self._last = 0.0
+        self._task = None
+
+    def local(self):
+        return self._wall + (time.monotonic() - self._mono)
+
+    def time(self):
+        """Exchange time in seconds"""
+        now = self.local() + self.offset / 1000
+        if now < self._last:
+            return self._last
+        self._last = now
+        return now
+
+    def now_ms(self):
+        return int(self.time() * 1000)
+
+    def one_way_ms(self, exchange_ms):
+        """Latency of a message stamped by the exchange at `exchange_ms`"""
+        return self.time() * 1000 - exchange_ms
+
+    async def sample(self):
+        sent = self.local()
+        server = await self.sampler()
+        received = self.local()
+        rtt = (received - sent) * 1000
+        self._samples.append((rtt, server - (sent + received) * 500))
+        self.rtt, self.offset = min(self._samples)
+        return self.offset
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        # a short burst first so the estimate starts from the best of a few
+        burst = 3
+        while True:
+            try:
+                await self.sample()
+            except Exception as e:
+                _LOGGER.warning("clock sample failed: %s", e)
+            if burst:
+                burst -= 1
+                await asyncio.sleep(0.2)
+            else:
+                _LOGGER.debug("clock offset %.1fms rtt %.1fms", self.offset, self.rtt or 0)
+                await asyncio.sleep(self.interval)
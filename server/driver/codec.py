@@ -0,0 +1,99 @@
+"""Websocket frame codec
+
+Picks the fastest JSON library available (orjson, ujson, then the stdlib)
+and offers `peek` / `peek_int` to read a frame's type, topic or a number
+without decoding it.
+"""
+import json
+import re
+
+_BACKENDS = {}
+
+# name: (loads, dumps, frame length from which `peek` beats a full decode)
+try:
+    import orjson
+    _BACKENDS["orjson"] = (orjson.loads,
+                           lambda obj: orjson.dumps(obj).decode("utf-8"), 256)
+except ImportError:
+    pass
+
+try:
+    import ujson
+    _BACKENDS["ujson"] = (ujson.loads, ujson.dumps, 128)
+except ImportError:
+    pass
+
+_BACKENDS["json"] = (json.loads, json.dumps, 0)
+
+backend = None
+loads = None
+dumps = None
+peek_min = 0
+
+
+def use(name=None):
+    """Select the decoder backend
+
+    Args:
+        name: orjson, ujson or json, None picks the fastest installed
+
+    Raises:
+        ValueError: backend not installed
+    """
+    global backend, loads, dumps, peek_min
+    if name is None:
+        name = next(iter(_BACKENDS))
+    if name not in _BACKENDS:
+        raise ValueError("json backend %s not available" % name)
+    backend = name
+    loads, dumps, peek_min = _BACKENDS[name]
+
+
+def available():
+    return list(_BACKENDS)
+
+
+def peek(raw):
+    """Read top-level type and topic from a raw frame
+
+    Only keys located before `"data"` are trusted, so payload fields with
+    the same name are never picked up.
+
+    Returns:
+        (type, topic), both None when the frame must be fully decoded
+    """
+    if not isinstance(raw, str):
+        return None, None
+    end = raw.find('"data"')
+    if end < 0:
+        end = len(raw)
+    start = raw.find('"type":"', 0, end)
+    if start < 0:
+        return None, None
+    start += 8
+    msg_type = raw[start:raw.find('"', start)]
+    start = raw.find('"topic":"', 0, end)
+    if start < 0:
+        # topic after the payload or missing
+        return None, None
+    start += 9
+    return msg_type, raw[start:raw.find('"', start)]
+
+
+_INT_PATTERNS = {}
+
+
+def peek_int(raw, key, start=0):
+    """Integer value of the first `key` found from `start` in a raw frame
+
+    Returns:
+        int, None when the key is missing or not an integer
+    """
+    pattern = _INT_PATTERNS.get(key)
+    if pattern is None:
+        pattern = _INT_PATTERNS[key] = re.compile(r'"%s":\s*(-?\d+)[,}\s]' % re.escape(key))
+    match = pattern.search(raw, start)
+    return int(match.group(1)) if match else None
+
+
+use()
@@ -0,0 +1,77 @@
+class SubscribeHandle:
+    """订阅句柄"""
+
+    def __init__(self, table=None, topic=None, cb=None):
+        self.cancle = False
+        self.table = table
+        self.topic = topic
+        self.cb = cb
+
+    def unsubscribe(self):
+        if self.cancle:
+            return
+        self.cancle = True
+        if self.table is not None:
+            self.table.remove(self)
+
+
+class DispatchTable:
+    """Topic -> subscriber registry
+
+    Callbacks of a topic are kept as a tuple snapshot rebuilt only when a
+    subscription is added or cancelled, so fan-out on the receive path is a
+    single dict lookup and iteration without copying or filtering.
+    """
+
+    def __init__(self, on_empty=None):
+        self.handles = {}
+        self.callbacks = {}
+        self.on_empty = on_empty
+
+    def __contains__(self, topic):
+        return topic in self.callbacks
+
+    def __len__(self):
+        return len(self.callbacks)
+
+    def topics(self):
+        return list(self.callbacks)
+
+    def get(self, topic):
+        """Returns:
+            tuple of callbacks, empty when nobody subscribed
+        """
+        return self.callbacks.get(topic, ())
+
+    def add(self, topic, cb):
+        """Register a callback
+
+        Returns:
+            (SubscribeHandle, first subscriber of the topic or not)
+        """
+        handle = SubscribeHandle(self, topic, cb)
+        handles = self.handles.get(topic)
+        first = handles is None
+        if first:
+            handles = self.handles[topic] = []
+        handles.append(handle)
+        self.callbacks[topic] = tuple(h.cb for h in handles)
+        return handle, first
+
+    def remove(self, handle):
+        handles = self.handles.get(handle.topic)
+        if not handles or handle not in handles:
+            return
+        handles.remove(handle)
+        if handles:
+            self.callbacks[handle.topic] = tuple(h.cb for h in handles)
+            return
+        self.discard(handle.topic)
+        if self.on_empty:
+            self.on_empty(handle.topic)
+
+    def discard(self, topic):
+        """Drop a topic and all its subscribers"""
+        for handle in self.handles.pop(topic, ()):
+            handle.cancle = True
+        self.callbacks.pop(topic, None)
@@ -1,99 +1,407 @@
 import aiohttp
 import asyncio
+import collections
+import itertools
 import logging
+import random
+import time
 
-_LOGGER = logging.getLogger("driver")
-_LOGGER.setLevel(logging.DEBUG)
+from urllib.parse import urljoin, urlparse
 
+from monitor.metrics import WS_FEED_DROPS, WS_FEED_WINS, WS_LINKS, WS_MESSAGES, WS_RECONNECTS
 
-class SubscribeHandle:
-    """订阅句柄"""
+from .clock import ExchangeClock
+from .dispatch import DispatchTable
 
-    def __init__(self):
-        self.cancle = False
+_LOGGER = logging.getLogger("driver")
+_LOGGER.setLevel(logging.DEBUG)
 
-    def unsubscribe(self):
-        self.cancle = True
+# REST connection pool, overridden by the exchange "connector" config
+CONNECTOR_DEFAULT = {
+    "limit": 100,               # pool size
+    "limit_per_host": 0,        # 0: no per host limit
+    "dns_ttl": 300,             # dns cache ttl (s)
+    "keepalive_timeout": 60,    # idle connection lifetime (s)
+    "warm": 0,                  # idle connections kept open to the REST host
+    "warm_interval": 20,        # warm up period (s), keep below keepalive_timeout
+}
 
 
 class ExchangeAbstract:
     """ Exchange abstract driver
     """
+
+    # cheap REST path used to keep pooled connections warm
+    warm_path = None
+
     def __init__(self, url):
         self.url = url
+        # metric label, the registry sets a per account name
+        self.label = urlparse(url).hostname
+        # wall clock in seconds used for signatures and message ids
+        self.clock = time.time
+        self.time_sync = None
         self.request = None
+        # active link, the others in `_links` are standby
         self.websocket = None
-        self.publish_handler = {}
+        self._links = []
+        self._ws_tasks = []
+        # redundant links all deliver, the first copy of a sequence wins
+        self.arbitrate = False
+        self.feed_wins = []
+        self.feed_drops = []
+        self._last_seq = {}
+        # frames a standby link keeps to fill the gap once promoted
+        self.standby_buffer = 4096
+        self._standby_frames = {}
+        self._track_seq = False
+        self.publish_handler = DispatchTable(self._queue_unsubscribe)
+        self._topic_messages = {}
+        self._unsub_pending = set()
+        self._unsub_flushing = False
+        # topics batched into the next subscribe request, waiting for the ack
+        self._sub_pending = {}
+        self._sub_flushing = False
+        self._sub_waiters = {}
+        self._acks = {}
+        self._msg_ids = itertools.count(1)
+        # seconds a subscribe waits for its ack
+        self.ack_timeout = 10
+        self._warmer = None
+        # external market data source replacing the websocket, see tradecore.worker
+        self.feed = None
+        # raw frame journal, see journal.JournalRecorder
+        self.recorder = None
+        # (topic, raw frame) consumer of delivered frames, see tradecore.worker
+        self.tap = None
+        # REST request budget, see driver.ratelimit.RequestScheduler
+        self.scheduler = None
+        # stage latency histograms, see monitor.stages
+        self.probe = None
+
+    def setup(self, connector=None):
+        """Create the REST session
+
+        Args:
+            connector: pool options, see CONNECTOR_DEFAULT
+        """
+        conf = dict(CONNECTOR_DEFAULT)
+        if connector:
+            conf.update(connector)
+
+        # asyncio transports already set TCP_NODELAY on every connection
+        self.request = aiohttp.ClientSession(connector=aiohttp.TCPConnector(
+            limit=conf["limit"],
+            limit_per_host=conf["limit_per_host"],
+            use_dns_cache=conf["dns_ttl"] > 0,
+            ttl_dns_cache=conf["dns_ttl"] or None,
+            keepalive_timeout=conf["keepalive_timeout"]))
+
+        if conf["warm"] > 0 and self.warm_path:
+            self._warmer = asyncio.ensure_future(
+                self._warm_pool(conf["warm"], conf["warm_interval"]))
+
+    async def _warm_pool(self, count, interval):
+        """Keep `count` idle keep-alive connections open to the REST host
+
+        Concurrent requests force the pool to open that many connections,
+        repeating them before keepalive_timeout keeps them from expiring.
+        """
+        url = urljoin(self.url, self.warm_path)
+
+        async def _touch():
+            async with self.request.get(url) as r:
+                await r.read()
+
+        while self.request is not None:
+            results = await asyncio.gather(*[_touch() for _ in range(count)],
+                                           return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    _LOGGER.warning("connection warm up failed: %s", result)
+                    break
+            await asyncio.sleep(interval)
+
+    def sync_clock(self, interval=30):
+        """Switch `clock` to an estimate of the exchange time"""
+        if self.time_sync is None:
+            self.time_sync = ExchangeClock(self.server_time, interval)
+            self.clock = self.time_sync.time
+        self.time_sync.start()
 
-    def setup(self):
-        self.request = aiohttp.ClientSession()
+    async def server_time(self):
+        """Exchange time in milliseconds"""
+        raise NotImplementedError
 
     async def release(self):
+        if self.time_sync:
+            self.time_sync.stop()
+
+        if self.recorder:
+            recorder, self.recorder = self.recorder, None
+            await recorder.close()
+
+        if self._warmer:
+            self._warmer.cancel()
+            self._warmer = None
+
+        for task in self._ws_tasks:
+            task.cancel()
+        self._ws_tasks = []
+
+        for ws in self._links:
+            await ws.close()
+        self._links = []
+        self.websocket = None
+
         if self.request:
             await self.request.close()
             self.request = None
 
-        if self.websocket:
-            await self.websocket.close()
-            self.websocket = None
+    async def _connect(self, slot, endpoint, waiter, max_reconnect, retry_interval, retry_max):
+        """Keep one websocket link up
 
-    async def _connect(self, url, encryt, max_reconnect, retry_interval, waiter):
-        assert self.websocket is None, "websocket already exists!"
+        The first connect of `ws_connect` gives up after `max_reconnect`
+        failures in a row. Any other link never gives up, it keeps retrying
+        every `retry_max` seconds once the backoff reached it. Every retry
+        waits an exponential, jittered backoff and asks a fresh endpoint, the
+        connection token may have expired. Active topics are subscribed again
+        on each connection.
 
-        _reconnect = max_reconnect
+        Args:
+            slot: link number
+            endpoint: (url, encryt, ping) for the first attempt, None to fetch one
+            waiter: resolved once connected
+        """
+        failures = 0
 
-        def _awake_waiter(waiter):
+        def _awake_waiter(exc=None):
             if waiter and not waiter.done():
-                waiter.set_result(None)
-                waiter = None
+                if exc is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(exc)
+
+        while self.request is not None:
+            if failures > max_reconnect:
+                if waiter is not None and not waiter.done():
+                    _LOGGER.error("websocket connect failed %d times, give up", failures)
+                    _awake_waiter(ConnectionError("websocket connect failed"))
+                    break
+                if failures == max_reconnect + 1:
+                    _LOGGER.error("websocket link %d down, retry every %ss", slot, retry_max)
 
-        while True:
-            if _reconnect < 0:
-                _LOGGER.error("websocket connect timeout")
-                _awake_waiter(waiter)
-                break
-
-            _LOGGER.info("websocket connecting...")
-            async with self.request.ws_connect(url, ssl=encryt) as ws:
-                _awake_waiter(waiter)
-                self.websocket = ws
-
-                async for msg in ws:
-                    if msg.type == aiohttp.WSMsgType.TEXT:
-                        msg_type, topic, content = self._check_publish_data(msg.data)
-
-                        if topic and topic in self.publish_handler:
-                            for handle, cb in self.publish_handler[topic][:]:
-                                if handle.cancle:
-                                    self.publish_handler[topic].remove((handle, cb))
-                                    continue
-                                try:
-                                    cb(msg_type, content)
-                                except Exception as e:
-                                    _LOGGER.error("topic %s recv failed: %s: %s", topic, type(e), e)
-
-                            # do unsubscrib when no subscriber
-                            if not self.publish_handler[topic]:
-                                try:
-                                    await self._unsub_request(topic)
-                                except Exception as e:
-                                    _LOGGER.error("unsubscribe %s failed: %s", topic, e)
-                                    continue
-                                del self.publish_handler[topic]
-                    elif msg.type == aiohttp.WSMsgType.ERROR:
-                        _LOGGER.error("websocket error occur: %s", msg.data)
-                        break
-                    elif msg.type == aiohttp.WSMsgType.CLOSE:
-                        _LOGGER.error("websocket closed")
-                        break
-        
-            # reset websocket and try reconnect
-            self.websocket = None
-            _reconnect -= 1
-            await asyncio.sleep(retry_interval)
+            if failures:
+                delay = min(retry_max, retry_interval * 2 ** min(failures - 1, 16))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+            ws = None
+            try:
+                if endpoint is None:
+                    endpoint = await self._ws_endpoint(slot)
+                url, encryt = endpoint[0], endpoint[1]
+
+                _LOGGER.info("websocket connecting...")
+                async with self.request.ws_connect(url, ssl=encryt) as ws:
+                    failures = 0
+                    self._links.append(ws)
+                    WS_LINKS.labels(self.label).set(len(self._links))
+                    if self.websocket is None:
+                        self.websocket = ws
+                    if len(self.publish_handler):
+                        await self._sub_request(self.publish_handler.topics(), ws)
+                    _awake_waiter()
+
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            if self.arbitrate:
+                                self._on_race_frame(msg.data, slot, ws)
+                                continue
+                            # a standby link only buffers until promoted
+                            if ws is not self.websocket:
+                                self._on_standby_frame(ws, msg.data)
+                                continue
+                            if self.recorder is not None:
+                                self.recorder.append(msg.data)
+                            self._on_frame(msg.data)
+                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                            _LOGGER.error("websocket error occur: %s", msg.data)
+                            break
+                        elif msg.type == aiohttp.WSMsgType.CLOSE:
+                            _LOGGER.error("websocket closed")
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _LOGGER.error("websocket connect failed: %s", e)
+            finally:
+                if ws is not None and ws in self._links:
+                    self._drop_link(ws)
+
+            endpoint = None
+            failures += 1
+            WS_RECONNECTS.labels(self.label).inc()
+
+    def _drop_link(self, ws):
+        """Link `ws` closed, promote the standby when it was the active one"""
+        self._links.remove(ws)
+        self._standby_frames.pop(ws, None)
+        WS_LINKS.labels(self.label).set(len(self._links))
+        lost = self._drop_acks(ws)
+        if self.websocket is ws:
+            self._promote(self._links[0] if self._links else None)
+            self._repoint_acks(lost, ConnectionResetError("websocket connect lost"))
+
+    def _on_standby_frame(self, ws, data):
+        topic, _ = self._peek_frame(data)
+        if topic is None:
+            # acks of the standby requests count once it is promoted
+            msg_type, topic, content = self._check_publish_data(data)
+            if not topic:
+                return
+        self._buffer_standby(ws, data)
+
+    def _buffer_standby(self, ws, data):
+        if not self._track_seq or not self.standby_buffer:
+            return
+        frames = self._standby_frames.get(ws)
+        if frames is None:
+            frames = self._standby_frames[ws] = collections.deque(maxlen=self.standby_buffer)
+        frames.append(data)
+
+    def _promote(self, ws):
+        """Make `ws` the active link
+
+        Frames the standby received before the active link dropped are
+        delivered when newer than the last delivered sequence of their
+        topic. Frames without a sequence cannot be told from duplicates and
+        are left out.
+        """
+        self.websocket = ws
+        frames = self._standby_frames.pop(ws, None)
+        if not frames:
+            return
+        replayed = 0
+        for data in frames:
+            msg_type, topic, content = self._check_publish_data(data)
+            if not topic:
+                continue
+            seq = self._frame_sequence(content)
+            last = self._last_seq.get(topic)
+            if seq is None or (last is not None and seq <= last):
+                continue
+            if self.recorder is not None:
+                self.recorder.append(data)
+            if self.tap is not None:
+                self.tap(topic, data)
+            self._dispatch(topic, msg_type, content)
+            replayed += 1
+        _LOGGER.info("standby link promoted, %d buffered frames replayed", replayed)
+
+    def _on_frame(self, data):
+        """Decode one frame and fan it out to the topic subscribers"""
+        if self.probe is not None:
+            return self._on_frame_probed(data)
+
+        msg_type, topic, content = self._check_publish_data(data)
+        if topic:
+            if self.tap is not None:
+                self.tap(topic, data)
+            self._dispatch(topic, msg_type, content)
+
+    def _on_frame_probed(self, data):
+        probe = self.probe
+        received = self.clock() * 1000
+        start = time.perf_counter_ns()
+        msg_type, topic, content = self._check_publish_data(data)
+        decoded = time.perf_counter_ns()
+        probe.decode.record(decoded - start)
+
+        if topic:
+            pushed = self._frame_time(content)
+            if pushed:
+                probe.receive.record(int((received - pushed) * 1e6))
+            if self.tap is not None:
+                self.tap(topic, data)
+            self._dispatch(topic, msg_type, content)
+            probe.dispatch.record(time.perf_counter_ns() - decoded)
+
+    def _on_race_frame(self, data, slot, ws):
+        """Deliver a frame of a redundant link unless another link was first
+
+        Copies already delivered are recognized from the raw frame and
+        dropped before the full decode.
+        """
+        topic, seq = self._peek_frame(data)
+        if seq is not None and self._stale(topic, seq, slot):
+            return
+
+        msg_type, topic, content = self._check_publish_data(data)
+        if not topic:
+            return
+
+        if seq is None:
+            seq = self._frame_sequence(content)
+            if seq is None:
+                # nothing to match copies on, trust the active link only
+                if ws is not self.websocket:
+                    return
+            elif self._stale(topic, seq, slot):
+                return
+        if seq is not None:
+            self._last_seq[topic] = seq
+            self.feed_wins[slot].value += 1
+
+        if self.recorder is not None:
+            self.recorder.append(data)
+        if self.tap is not None:
+            self.tap(topic, data)
+        self._dispatch(topic, msg_type, content)
+
+    def _stale(self, topic, seq, slot):
+        last = self._last_seq.get(topic)
+        if last is not None and seq <= last:
+            self.feed_drops[slot].value += 1
+            return True
+        return False
+
+    def feed_win_rate(self):
+        """Share of the messages each redundant link delivered first"""
+        total = sum(child.value for child in self.feed_wins)
+        return [child.value / total if total else 0 for child in self.feed_wins]
+
+    def _frame_sequence(self, content):
+        """Per topic increasing number of a decoded frame, None if unknown"""
+        return None
+
+    def _peek_frame(self, data):
+        """(topic, sequence) read from a raw frame, (None, None) if unknown"""
+        return None, None
+
+    def _frame_time(self, content):
+        """Exchange push time of a decoded frame in milliseconds, None if unknown"""
+        return None
+
+    def _dispatch(self, topic, msg_type, content):
+        counter = self._topic_messages.get(topic)
+        if counter is None:
+            counter = self._topic_messages[topic] = WS_MESSAGES.labels(self.label, topic)
+        counter.value += 1
+        if self._track_seq:
+            # last delivered, a promoted standby replays from there
+            seq = self._frame_sequence(content)
+            if seq is not None:
+                self._last_seq[topic] = seq
+
+        for cb in self.publish_handler.get(topic):
+            try:
+                cb(msg_type, content)
+            except Exception as e:
+                _LOGGER.error("topic %s recv failed: %s: %s", topic, type(e), e)
 
     async def ws_connect(self, url:str, encryt:bool, ping:int,
-                         max_reconnect=10, retry_interval=5):
+                         max_reconnect=10, retry_interval=1, retry_max=30,
+                         standby=False, links=1):
         """Websocket connect
         
         Corutine will be blocked until websocket connected or try max_reconnect.
@@ -103,15 +411,40 @@ class ExchangeAbstract:
             url:
             encryt:
             ping: heartbeat interval
-            max_reconnect: reconnect cnt limit
-            retry_interval:
+            max_reconnect: consecutive failures before the first connect gives up
+            retry_interval: first reconnect backoff (s), doubled per failure
+            retry_max: backoff limit (s)
+            standby: keep a second subscribed link to take over at once
+                when the active one drops, its last `standby_buffer` frames
+                fill the gap
+            links: above 1, subscribe on that many endpoints at once and
+                deliver each message from the link receiving it first
+
+        Raises:
+            ConnectionError: connect failed max_reconnect times
         """
         loop = asyncio.get_event_loop()
         waiter = loop.create_future()
-        asyncio.ensure_future(
-            self._connect(url, encryt, max_reconnect, retry_interval, waiter))
+        retry = (max_reconnect, retry_interval, retry_max)
+
+        self.arbitrate = links > 1
+        if self.arbitrate:
+            standby = False
+            self.feed_wins = [WS_FEED_WINS.labels(self.label, slot) for slot in range(links)]
+            self.feed_drops = [WS_FEED_DROPS.labels(self.label, slot) for slot in range(links)]
+        self._track_seq = standby
+
+        self._ws_tasks.append(asyncio.ensure_future(
+            self._connect(0, (url, encryt, ping), waiter, *retry)))
         await waiter
-        asyncio.ensure_future(self.heartbeat(ping))
+        for slot in range(1, links + 1 if standby else links):
+            self._ws_tasks.append(asyncio.ensure_future(
+                self._connect(slot, None, None, *retry)))
+        self._ws_tasks.append(asyncio.ensure_future(self.heartbeat(ping)))
+
+    async def _ws_endpoint(self, slot):
+        """Fresh (url, encryt, ping) for a (re)connect of link `slot`"""
+        raise NotImplementedError
 
     async def heartbeat(self, interval):
         """Websockeet heartbeat
@@ -120,38 +453,205 @@ class ExchangeAbstract:
             interval: ping interval
         """
         while True:
-            if self.websocket:
+            for ws in list(self._links):
                 try:
-                    await self._keepalive()
+                    await self._keepalive(ws)
                 except NotImplementedError:
-                    break
+                    return
+                except Exception as e:
+                    _LOGGER.warning("websocket ping failed: %s", e)
             await asyncio.sleep(interval)
 
     async def subscribe(self, topic, cb):
         """ Websocket subscibe
 
+        Subscribes of the same loop iteration share one request, the call
+        returns once the exchange acknowledged it.
+
         Args:
             topic: subscribe channel
             handle: publish callback
 
         Raises:
             ConnectionResetError: connect lost
+            asyncio.TimeoutError: no ack within `ack_timeout`
 
         Returns:
             SubscribeHandle: which could be used to unsubscribe topic
         """
-        handle = SubscribeHandle()
-        if topic not in self.publish_handler:
-            self.publish_handler[topic] = [(handle, cb)]
+        handle, first = self.publish_handler.add(topic, cb)
+        if first:
+            self._last_seq.pop(topic, None)
+        if first and topic in self._unsub_pending:
+            # unsubscribe not sent yet, the exchange side is still subscribed
+            self._unsub_pending.discard(topic)
+        elif first:
             try:
-                await self._sub_request(topic)
-            except Exception:
-                del self.publish_handler[topic]
+                if self.feed is not None:
+                    await self.feed.subscribe(self, topic)
+                else:
+                    await self._sub_wait(topic)
+            except BaseException:
+                self.publish_handler.discard(topic)
                 raise
-        else:
-            self.publish_handler[topic].append((handle, cb))
         return handle
 
+    async def subscribe_many(self, topics, cb):
+        """Subscribe `cb` to every topic in a single round trip
+
+        All or nothing: when a topic fails, the others are unsubscribed
+        again and the first error is raised.
+
+        Returns:
+            list of SubscribeHandle
+        """
+        results = await asyncio.gather(*[self.subscribe(topic, cb) for topic in topics],
+                                       return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            for result in results:
+                if not isinstance(result, BaseException):
+                    result.unsubscribe()
+            raise errors[0]
+        return results
+
+    async def _sub_wait(self, topic):
+        # links connecting later subscribe every active topic
+        if not self._links:
+            return
+        fut = self._sub_waiters.get(topic)
+        if fut is None:
+            fut = self._sub_waiters[topic] = asyncio.get_event_loop().create_future()
+        self._sub_pending[topic] = None
+        if not self._sub_flushing:
+            self._sub_flushing = True
+            asyncio.ensure_future(self._flush_subscribe())
+        try:
+            await asyncio.wait_for(fut, self.ack_timeout)
+        finally:
+            self._sub_waiters.pop(topic, None)
+
+    async def _flush_subscribe(self):
+        try:
+            # let the other subscribes of this iteration join the batch
+            await asyncio.sleep(0)
+            topics = list(self._sub_pending)
+            self._sub_pending.clear()
+        finally:
+            self._sub_flushing = False
+
+        for ws in list(self._links):
+            try:
+                await self._sub_request(topics, ws)
+            except Exception as e:
+                _LOGGER.error("subscribe %d topics failed: %s", len(topics), e)
+                if ws is self.websocket:
+                    self._resolve(topics, e)
+
+    def _msg_id(self):
+        """Unique request id"""
+        return str(next(self._msg_ids))
+
+    def _expect_ack(self, topics, ws):
+        """Request id whose ack or error on `ws` resolves the subscribes of `topics`"""
+        msg_id = self._msg_id()
+        self._acks[msg_id] = (ws, topics)
+        return msg_id
+
+    def _ack(self, msg_id, error=None):
+        """Ack or error received for request `msg_id`
+
+        Only the active link answers the subscribes, a standby answer is
+        dropped and the topics requested again should it be promoted.
+        """
+        entry = self._acks.pop(msg_id, None)
+        if entry is None:
+            return
+        ws, topics = entry
+        if ws is self.websocket:
+            self._resolve(topics, error)
+        elif error is not None:
+            _LOGGER.warning("standby subscribe failed: %s", error)
+
+    def _resolve(self, topics, error=None):
+        waiters = self._sub_waiters
+        for topic in topics:
+            fut = waiters.get(topic)
+            if fut is None or fut.done():
+                continue
+            if error is None:
+                fut.set_result(None)
+            else:
+                fut.set_exception(error)
+
+    def _drop_acks(self, ws):
+        """Forget the requests sent on `ws`
+
+        Returns:
+            their topics
+        """
+        topics = []
+        for msg_id, (link, requested) in list(self._acks.items()):
+            if link is ws:
+                del self._acks[msg_id]
+                topics.extend(requested)
+        return topics
+
+    def _repoint_acks(self, topics, error):
+        """Subscribes of a lost active link wait for the promoted one
+
+        Topics without a request pending on the new active link are
+        requested again on it, they fail with `error` when no link is left.
+        """
+        active = self.websocket
+        if active is None:
+            self._resolve(topics, error)
+            return
+        pending = set()
+        for ws, requested in self._acks.values():
+            if ws is active:
+                pending.update(requested)
+        retry = [topic for topic in topics
+                 if topic not in pending and topic in self._sub_waiters]
+        if retry:
+            asyncio.ensure_future(self._resubscribe(retry, active))
+
+    async def _resubscribe(self, topics, ws):
+        try:
+            await self._sub_request(topics, ws)
+        except Exception as e:
+            _LOGGER.error("subscribe %d topics failed: %s", len(topics), e)
+            self._resolve(topics, e)
+
+    def _queue_unsubscribe(self, topic):
+        """Last subscriber gone, unsubscribe later off the receive path"""
+        self._unsub_pending.add(topic)
+        if not self._unsub_flushing:
+            self._unsub_flushing = True
+            asyncio.ensure_future(self._flush_unsubscribe())
+
+    async def _flush_unsubscribe(self):
+        try:
+            await asyncio.sleep(0)
+            # subscribed again meanwhile are left out
+            topics = [topic for topic in self._unsub_pending
+                      if topic not in self.publish_handler]
+            self._unsub_pending.clear()
+        finally:
+            self._unsub_flushing = False
+
+        if not topics:
+            return
+        try:
+            if self.feed is not None:
+                for topic in topics:
+                    await self.feed.unsubscribe(self, topic)
+            else:
+                for ws in list(self._links):
+                    await self._unsub_request(topics, ws)
+        except Exception as e:
+            _LOGGER.error("unsubscribe %d topics failed: %s", len(topics), e)
+
     def _check_publish_data(self, msg_data):
         """publish msg filter
         
@@ -163,23 +663,28 @@ class ExchangeAbstract:
         """
         raise NotImplementedError
 
-    async def _keepalive(self):
+    async def _keepalive(self, ws):
         """keep websocket alive"""
         raise NotImplementedError
 
-    async def _sub_request(self, topic):
+    async def _sub_request(self, topics, ws):
         """Subscribe request
 
+        Frames take their id from `_expect_ack(topics, ws)` and report the
+        answer through `_ack`.
+
         Args:
-            topic: subscribe channel
+            topics: subscribe channels
+            ws: websocket link
         """
         raise NotImplementedError
 
-    async def _unsub_request(self, topic):
+    async def _unsub_request(self, topics, ws):
         """Unsubscribe request
 
         Args:
-            topic: unsubscribe channel
+            topics: unsubscribe channels
+            ws: websocket link
         """
         raise NotImplementedError
 
@@ -0,0 +1,133 @@
+"""Client side request scheduling
+
+Each endpoint class has its own token bucket, all classes share an optional
+account-wide bucket. Requests that cannot start wait in a heap per class
+keyed by (priority, arrival): when the shared budget is short, a queued
+order goes before queued reads whatever their arrival order, and waiters of
+a class out of tokens are left alone until the class refills.
+"""
+import asyncio
+import heapq
+import itertools
+
+
+class TokenBucket:
+
+    __slots__ = ("capacity", "rate", "tokens", "stamp")
+
+    def __init__(self, capacity, rate):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.stamp = None
+
+    def refill(self, now):
+        if self.stamp is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def delay(self):
+        """Seconds until one token is available, after refill"""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class RequestScheduler:
+    """Token bucket scheduler with priorities
+
+    Args:
+        budgets: {class: (capacity, refill per second)}
+        total: (capacity, refill per second) shared by all classes, or None
+    """
+
+    def __init__(self, budgets, total=None):
+        self.buckets = {name: TokenBucket(*budget) for name, budget in budgets.items()}
+        self.total = TokenBucket(*total) if total else None
+        self.rejected = 0
+        self._waiters = {}      # class -> heap of (priority, seq, waiter)
+        self._seq = itertools.count()
+        self._timer = None
+
+    async def acquire(self, name, priority=0):
+        """Wait for a request slot
+
+        Args:
+            name: endpoint class, unknown classes only use the shared budget
+            priority: lower goes first
+        """
+        loop = asyncio.get_event_loop()
+        if not self._waiters and self._take(name, loop.time()):
+            return
+        waiter = loop.create_future()
+        heapq.heappush(self._waiters.setdefault(name, []), (priority, next(self._seq), waiter))
+        # pump now, a timer armed for a blocked class must not hold this one
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pump()
+        await waiter
+
+    def backoff(self, name, seconds):
+        """Exchange rejected a request (429): drain the budgets for a while"""
+        self.rejected += 1
+        for bucket in (self.buckets.get(name), self.total):
+            if bucket is not None:
+                bucket.tokens = min(bucket.tokens, 0) - bucket.rate * seconds
+
+    def _take(self, name, now):
+        bucket = self.buckets.get(name)
+        total = self.total
+        if bucket is not None:
+            bucket.refill(now)
+            if bucket.tokens < 1:
+                return False
+        if total is not None:
+            total.refill(now)
+            if total.tokens < 1:
+                return False
+            total.tokens -= 1
+        if bucket is not None:
+            bucket.tokens -= 1
+        return True
+
+    def _schedule(self, delay):
+        if self._timer is not None:
+            return
+        loop = asyncio.get_event_loop()
+        self._timer = loop.call_later(delay, self._pump)
+
+    def _pump(self):
+        self._timer = None
+        now = asyncio.get_event_loop().time()
+        queues = self._waiters
+        blocked = set()
+        delay = None
+        while True:
+            # best head among the classes still having tokens
+            best = None
+            for name, queue in queues.items():
+                if name in blocked:
+                    continue
+                while queue and queue[0][2].done():
+                    heapq.heappop(queue)
+                if queue and (best is None or queue[0] < queues[best][0]):
+                    best = name
+            if best is None:
+                break
+            if self._take(best, now):
+                heapq.heappop(queues[best])[2].set_result(None)
+                continue
+            bucket = self.buckets.get(best)
+            if bucket is not None and bucket.tokens < 1:
+                blocked.add(best)
+                wait = bucket.delay()
+                delay = wait if delay is None else min(delay, wait)
+                continue
+            # shared budget exhausted, lower priorities wait their turn
+            wait = self.total.delay()
+            delay = wait if delay is None else min(delay, wait)
+            break
+
+        for name in [name for name, queue in queues.items() if not queue]:
+            del queues[name]
+        if queues:
+            self._schedule(delay or 0.001)
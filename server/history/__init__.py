@@ -0,0 +1,4 @@
+from .cache import ColumnCache
+from .service import HistoryService, SERIES
+
+__all__ = ["ColumnCache", "HistoryService", "SERIES"]
@@ -0,0 +1,111 @@
+import json
+import os
+
+from array import array
+from bisect import bisect_left
+
+
+def merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_ranges(ranges, start, end):
+    """Parts of [start, end) not covered by the merged `ranges`"""
+    missing = []
+    cursor = start
+    for lo, hi in ranges:
+        if hi <= cursor:
+            continue
+        if lo >= end:
+            break
+        if lo > cursor:
+            missing.append((cursor, lo))
+        cursor = max(cursor, hi)
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+class ColumnCache:
+    """On-disk columnar cache of one history series
+
+    Every column is a raw float64 file, `meta.json` lists the columns and the
+    time ranges already downloaded. Rows are kept sorted by the first column
+    (time in milliseconds) and are unique by the `key` columns.
+    """
+
+    def __init__(self, path, columns, key=(0,)):
+        self.path = path
+        self.columns = columns
+        self.key = key
+        self.ranges = []
+        self.data = {name: array('d') for name in columns}
+        self._load()
+
+    def _meta_path(self):
+        return os.path.join(self.path, "meta.json")
+
+    def _load(self):
+        if not os.path.exists(self._meta_path()):
+            return
+        with open(self._meta_path(), 'r') as f:
+            meta = json.loads(f.read())
+        if meta["columns"] != list(self.columns):
+            return
+        rows = meta["rows"]
+        for name in self.columns:
+            col = array('d')
+            with open(os.path.join(self.path, name + ".f64"), 'rb') as f:
+                col.fromfile(f, rows)
+            self.data[name] = col
+        self.ranges = meta["ranges"]
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        for name, col in self.data.items():
+            with open(os.path.join(self.path, name + ".f64"), 'wb') as f:
+                col.tofile(f)
+        with open(self._meta_path(), 'w') as f:
+            f.write(json.dumps({
+                "columns": list(self.columns),
+                "rows": len(self.data[self.columns[0]]),
+                "ranges": self.ranges,
+            }))
+
+    def missing(self, start, end):
+        return missing_ranges(self.ranges, start, end)
+
+    def merge(self, rows, ranges):
+        """Add downloaded rows and mark `ranges` as covered
+
+        Duplicates from overlapping pages are dropped by key, the
+        downloaded row wins.
+        """
+        columns = self.columns
+        key = self.key
+        merged = {}
+        for row in zip(*[self.data[name] for name in columns]):
+            merged[tuple(row[i] for i in key)] = row
+        for row in rows:
+            merged[tuple(row[i] for i in key)] = row
+        ordered = sorted(merged.values(), key=lambda row: row[0])
+
+        data = {name: array('d') for name in columns}
+        for row in ordered:
+            for name, value in zip(columns, row):
+                data[name].append(value)
+        self.data = data
+        self.ranges = merge_ranges(self.ranges + [list(r) for r in ranges])
+
+    def select(self, start, end):
+        """Columns restricted to start <= time < end"""
+        times = self.data[self.columns[0]]
+        lo = bisect_left(times, start)
+        hi = bisect_left(times, end)
+        return {name: col[lo:hi] for name, col in self.data.items()}
@@ -0,0 +1,204 @@
+"""历史数据下载
+
+A time range is split into windows fetched concurrently under a request
+budget, pages inside a window are walked by advancing the start time.
+Results are merged into a `ColumnCache`, later loads only download the
+ranges the cache does not cover yet.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from .cache import ColumnCache
+
+_LOGGER = logging.getLogger("history")
+_LOGGER.setLevel(logging.DEBUG)
+
+KLINE_MAX_BARS = 200
+PAGE_SIZE = 100
+
+
+def _floats(item, fields):
+    return tuple(float(item[name] or 0) for name in fields)
+
+
+class _Series:
+    """How to fetch one kind of history"""
+
+    def __init__(self, columns, window, key=(0,)):
+        self.columns = columns
+        self.window = window
+        # columns identifying a row, see ColumnCache
+        self.key = key
+
+    def window_size(self, **opts):
+        return self.window
+
+    async def fetch(self, exchange, symbol, start, end, **opts):
+        raise NotImplementedError
+
+
+class _Kline(_Series):
+
+    def __init__(self):
+        super(_Kline, self).__init__(("time", "open", "high", "low", "close", "volume"), 0)
+
+    def window_size(self, granularity=1, **opts):
+        return granularity * 60000 * KLINE_MAX_BARS
+
+    async def fetch(self, exchange, symbol, start, end, granularity=1, **opts):
+        rows = await exchange.get_kline_data(symbol, granularity, start, end - 1)
+        return [tuple(float(v) for v in row) for row in rows or ()
+                if start <= row[0] < end]
+
+
+class _TimePointList(_Series):
+    """`dataList` + `hasMore` endpoints keyed by timePoint"""
+
+    def __init__(self, method, fields, window=6 * 3600000):
+        super(_TimePointList, self).__init__(("timePoint",) + fields, window)
+        self.method = method
+        self.fields = fields
+
+    async def fetch(self, exchange, symbol, start, end, **opts):
+        rows = []
+        cursor = start
+        while cursor < end:
+            data = await getattr(exchange, self.method)(
+                symbol, startAt=cursor, endAt=end - 1, reverse=False,
+                forward=True, maxCount=PAGE_SIZE)
+            items = data.get('dataList') or []
+            for item in items:
+                if start <= item['timePoint'] < end:
+                    rows.append((float(item['timePoint']),) + _floats(item, self.fields))
+            if not items or not data.get('hasMore'):
+                break
+            cursor = max(item['timePoint'] for item in items) + 1
+        return rows
+
+
+class _Fills(_Series):
+    """`get_fills_details`, paged by currentPage
+
+    side is 1 buy, -1 sell. The hex tradeId is split into two 48 bit halves,
+    exact in float64, and fills are unique by it.
+    """
+
+    FIELDS = ("price", "size", "value", "fee")
+
+    def __init__(self):
+        super(_Fills, self).__init__(("createdAt", "side") + self.FIELDS + ("trade_hi", "trade_lo"),
+                                     24 * 3600000, key=(6, 7))
+
+    async def fetch(self, exchange, symbol, start, end, **opts):
+        rows = []
+        page = 1
+        while True:
+            data = await exchange.get_fills_details(
+                symbol, startAt=start, endAt=end - 1, currentPage=page, pageSize=PAGE_SIZE)
+            for item in data.get('items') or ():
+                trade = int(item['tradeId'], 16)
+                rows.append((float(item['createdAt']), 1.0 if item['side'] == 'buy' else -1.0)
+                            + _floats(item, self.FIELDS)
+                            + (float(trade >> 48), float(trade & 0xffffffffffff)))
+            if page >= data.get('totalPage', 0):
+                break
+            page += 1
+        return rows
+
+
+SERIES = {
+    "kline": _Kline(),
+    "interest": _TimePointList("get_interest_rate", ("value",)),
+    "index": _TimePointList("get_index_list", ("value",)),
+    "premium": _TimePointList("get_premium_index", ("value",)),
+    "funding": _TimePointList("get_fund_history", (
+        "fundingRate", "markPrice", "positionQty", "positionCost", "funding")),
+    "fills": _Fills(),
+}
+
+
+class HistoryService:
+    """History downloader with local columnar cache
+
+    Args:
+        exchange: KuMex exchange
+        root: cache directory
+        concurrency: windows fetched at the same time
+        rate: max requests started per second
+    """
+
+    def __init__(self, exchange, root="history", concurrency=4, rate=10):
+        self.exchange = exchange
+        self.root = root
+        self.rate = rate
+        self._sem = asyncio.Semaphore(concurrency)
+        self._next_slot = 0.0
+
+    def cache(self, kind, symbol, **opts):
+        series = SERIES[kind]
+        name = symbol + ''.join('-%s%s' % (k, v) for k, v in sorted(opts.items()))
+        return ColumnCache(os.path.join(self.root, kind, name),
+                           series.columns, series.key)
+
+    async def load(self, kind, symbol, start, end, **opts):
+        """Columns of a series over [start, end) in milliseconds
+
+        Args:
+            kind: kline, interest, index, premium, funding or fills
+            opts: series options, granularity (minutes) for kline
+
+        Returns:
+            {column: array('d')}
+        """
+        series = SERIES[kind]
+        cache = self.cache(kind, symbol, **opts)
+        step = series.window_size(**opts)
+
+        windows = []
+        for lo, hi in cache.missing(start, end):
+            for w_start in range(lo, hi, step):
+                windows.append((w_start, min(w_start + step, hi)))
+
+        if windows:
+            # no range past now is marked as covered
+            now = int(time.time() * 1000)
+            results = await asyncio.gather(*[
+                self._fetch(series, symbol, lo, hi, **opts) for lo, hi in windows])
+            rows = [row for result in results for row in result]
+            cache.merge(rows, [(lo, min(hi, now)) for lo, hi in windows if lo < now])
+            cache.save()
+            _LOGGER.info("%s %s: %d windows, %d rows downloaded",
+                         kind, symbol, len(windows), len(rows))
+
+        return cache.select(start, end)
+
+    async def _fetch(self, series, symbol, start, end, **opts):
+        async with self._sem:
+            return await series.fetch(_Paced(self), symbol, start, end, **opts)
+
+    async def _pace(self):
+        """Space request starts to respect `rate`"""
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class _Paced:
+    """Exchange proxy pacing every request of a paged fetch"""
+
+    def __init__(self, service):
+        self._service = service
+
+    def __getattr__(self, name):
+        method = getattr(self._service.exchange, name)
+
+        async def _call(*args, **kwargs):
+            await self._service._pace()
+            return await method(*args, **kwargs)
+
+        return _call
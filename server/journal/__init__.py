@@ -0,0 +1,4 @@
+from .recorder import JournalRecorder
+from .segment import iter_records, load_segment, stream_segment
+
+__all__ = ["JournalRecorder", "iter_records", "load_segment", "stream_segment"]
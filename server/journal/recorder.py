@@ -0,0 +1,152 @@
+import asyncio
+import collections
+import logging
+import os
+import threading
+import time
+
+from .segment import RECORD, EXTENSIONS, open_writer, resolve
+
+_LOGGER = logging.getLogger("journal")
+_LOGGER.setLevel(logging.DEBUG)
+
+
+class JournalRecorder:
+    """Append-only market data journal
+
+    `append` only timestamps the frame and pushes it on a bounded deque, a
+    background thread batches, compresses and writes the records, rotating
+    segments by size and age. When the writer falls behind by `max_pending`
+    frames new frames are dropped and counted rather than growing memory.
+    `max_segments` and `max_age` (seconds) bound the journal on disk: older
+    segments of this prefix are deleted whenever a new one is opened.
+    """
+
+    def __init__(self, path, prefix, codec="zstd", segment_size=64 << 20,
+                 segment_seconds=3600, flush_interval=0.05, max_pending=200000,
+                 batch_size=4096, max_segments=None, max_age=None):
+        self.path = path
+        self.prefix = prefix
+        self.codec = resolve(codec)
+        self.segment_size = segment_size
+        self.segment_seconds = segment_seconds
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.max_segments = max_segments
+        self.max_age = max_age
+        # only touched on the loop thread, the writer keeps its own watermark
+        self.dropped = 0
+        self._dropped_logged = 0
+        self.written = 0
+        self._pending = collections.deque()
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._file_bytes = 0
+        self._file_opened = 0
+
+    def start(self):
+        os.makedirs(self.path, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="journal-" + self.prefix,
+                                        daemon=True)
+        self._thread.start()
+        _LOGGER.info("journal %s recording to %s (%s)", self.prefix, self.path, self.codec)
+
+    async def close(self):
+        """Flush pending frames and close the current segment"""
+        if self._thread is None:
+            return
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        await asyncio.get_event_loop().run_in_executor(None, thread.join)
+
+    def append(self, frame):
+        """Record a frame, called from the receive loop"""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append((time.time_ns(), frame))
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.flush_interval):
+                self._flush()
+            self._flush()
+        except Exception as e:
+            _LOGGER.error("journal %s writer stopped: %s", self.prefix, e)
+        finally:
+            self._close_segment()
+
+    def _flush(self):
+        while self._pending:
+            self._write_batch()
+
+        dropped = self.dropped
+        if dropped != self._dropped_logged:
+            _LOGGER.warning("journal %s dropped %d frames", self.prefix,
+                            dropped - self._dropped_logged)
+            self._dropped_logged = dropped
+
+    def _write_batch(self):
+        pending = self._pending
+        batch = bytearray()
+        pack = RECORD.pack
+        popleft = pending.popleft
+        for _ in range(min(len(pending), self.batch_size)):
+            ts, frame = popleft()
+            if isinstance(frame, str):
+                frame = frame.encode('utf-8')
+            batch += pack(ts, len(frame))
+            batch += frame
+
+        if self._file is None or self._should_rotate():
+            self._close_segment()
+            self._open_segment()
+        self._file.write(batch)
+        self._file_bytes += len(batch)
+        self.written += len(batch)
+
+    def _should_rotate(self):
+        return (self._file_bytes >= self.segment_size or
+                time.monotonic() - self._file_opened >= self.segment_seconds)
+
+    def _open_segment(self):
+        name = "%s-%d.hbj%s" % (self.prefix, time.time_ns(), EXTENSIONS[self.codec])
+        self._file = open_writer(os.path.join(self.path, name), self.codec)
+        self._file_bytes = 0
+        self._file_opened = time.monotonic()
+        if self.max_segments or self.max_age:
+            self._prune(name)
+
+    def _prune(self, current):
+        """Delete segments beyond `max_segments` or older than `max_age`"""
+        head = self.prefix + "-"
+        segments = []
+        for name in os.listdir(self.path):
+            if name == current or not name.startswith(head) or ".hbj" not in name:
+                continue
+            stamp = name[len(head):].split(".", 1)[0]
+            if stamp.isdigit():
+                segments.append((int(stamp), name))
+        segments.sort()
+
+        expired = []
+        if self.max_segments:
+            # the segment just opened counts against the limit
+            excess = len(segments) + 1 - self.max_segments
+            expired.extend(segments[:max(excess, 0)])
+        if self.max_age:
+            horizon = time.time_ns() - int(self.max_age * 1e9)
+            expired.extend(s for s in segments if s[0] < horizon)
+
+        for _, name in sorted(set(expired)):
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError as e:
+                _LOGGER.warning("journal %s cannot remove %s: %s", self.prefix, name, e)
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,173 @@
+"""Journal segment files
+
+A segment is a compressed stream of records:
+
+    ts_ns(u64) length(u32) frame
+
+`ts_ns` is the receive time in nanoseconds, `frame` the raw websocket text.
+"""
+import gzip
+import mmap
+import struct
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+RECORD = struct.Struct("<QI")
+
+CODEC_ZSTD = "zstd"
+CODEC_LZ4 = "lz4"
+CODEC_GZIP = "gzip"
+CODEC_NONE = "none"
+
+EXTENSIONS = {
+    CODEC_ZSTD: ".zst",
+    CODEC_LZ4: ".lz4",
+    CODEC_GZIP: ".gz",
+    CODEC_NONE: ".raw",
+}
+
+
+def available():
+    codecs = []
+    if zstandard is not None:
+        codecs.append(CODEC_ZSTD)
+    if lz4 is not None:
+        codecs.append(CODEC_LZ4)
+    codecs += [CODEC_GZIP, CODEC_NONE]
+    return codecs
+
+
+def resolve(codec):
+    """Requested codec, or the best installed one when it is missing"""
+    codecs = available()
+    if codec in codecs:
+        return codec
+    return codecs[0]
+
+
+def open_writer(path, codec):
+    """Binary file object compressing into `path`"""
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, 'wb'))
+    if codec == CODEC_LZ4:
+        return lz4.frame.open(path, 'wb')
+    if codec == CODEC_GZIP:
+        return gzip.open(path, 'wb', compresslevel=1)
+    return open(path, 'wb')
+
+
+def codec_of(path):
+    for codec, ext in EXTENSIONS.items():
+        if path.endswith(ext):
+            return codec
+    raise ValueError("unknown journal segment %s" % path)
+
+
+def open_reader(path):
+    """Binary file object decompressing `path`"""
+    codec = codec_of(path)
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    if codec == CODEC_LZ4:
+        return lz4.frame.open(path, 'rb')
+    if codec == CODEC_GZIP:
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def first_time(path):
+    """Receive time of the first record, None for an empty segment"""
+    with open_reader(path) as reader:
+        head = reader.read(RECORD.size)
+    if len(head) < RECORD.size:
+        return None
+    return RECORD.unpack(head)[0]
+
+
+def load_segment(path):
+    """Load a whole segment
+
+    Uncompressed segments are used straight from a memory mapping,
+    compressed ones are decompressed fully into memory, use
+    `stream_segment` to bound memory on large compressed segments.
+
+    Returns:
+        bytes-like record buffer
+    """
+    codec = codec_of(path)
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty segment
+            return b''
+    if codec == CODEC_NONE:
+        return mapped
+    try:
+        if codec == CODEC_ZSTD:
+            with zstandard.ZstdDecompressor().stream_reader(mapped) as reader:
+                return reader.read()
+        if codec == CODEC_LZ4:
+            return lz4.frame.decompress(mapped)
+        return gzip.decompress(mapped)
+    finally:
+        mapped.close()
+
+
+def iter_records(buf):
+    """Yields:
+        (ts_ns, frame) from a record buffer, frame decoded as text
+    """
+    unpack = RECORD.unpack_from
+    header = RECORD.size
+    view = memoryview(buf)
+    offset = 0
+    end = len(buf)
+    while offset + header <= end:
+        ts, size = unpack(buf, offset)
+        offset += header
+        if offset + size > end:
+            # segment cut while writing
+            break
+        yield ts, str(view[offset:offset + size], 'utf-8')
+        offset += size
+
+
+def stream_segment(path, chunk_size=1 << 20):
+    """Yields:
+        (ts_ns, frame) from a segment, decompressed `chunk_size` at a time
+    """
+    if codec_of(path) == CODEC_NONE:
+        yield from iter_records(load_segment(path))
+        return
+
+    unpack = RECORD.unpack_from
+    header = RECORD.size
+    with open_reader(path) as reader:
+        buf = b''
+        offset = 0
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                # a record left over was cut while writing
+                return
+            buf = buf[offset:] + chunk
+            view = memoryview(buf)
+            offset = 0
+            end = len(buf)
+            while offset + header <= end:
+                ts, size = unpack(buf, offset)
+                if offset + header + size > end:
+                    break
+                offset += header
+                yield ts, str(view[offset:offset + size], 'utf-8')
+                offset += size
+            view.release()
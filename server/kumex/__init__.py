@@ -1,27 +1,31 @@
 import aiohttp
-import base64
-import hashlib
-import hmac
-import time
-import json
 import logging
+import time
 
 from uuid import uuid1
 from urllib.parse import urljoin
 
+from driver import codec
 from driver.exchange import ExchangeAbstract
+from monitor.metrics import REST_ERRORS
 
 from .const import (PUB_MSG_HELLO,
                     PUB_MSG_ACK,
                     PUB_MSG_ERR,
+                    PUB_MSG_MESSAGE,
                     PUB_MSG_PING,
                     PUB_MSG_PONG,
                     PUB_MSG_SUB,
-                    PUB_MSG_UNSUB)
+                    PUB_MSG_UNSUB,
+                    PRIVATE_TOPICS,
+                    SUB_SYMBOLS_MAX)
 from .request import MarketRequest
 from .request import TradeDataRequest
 from .request import UserRequest
 from .request import WebsocketRequest
+from .ratelimit import PRIORITY, classify
+from .refdata import ReferenceData
+from .signer import RequestSigner, encode_query
 
 
 mixin = [MarketRequest, TradeDataRequest,
@@ -34,20 +38,34 @@ _LOGGER.setLevel(logging.DEBUG)
 class KuMexExchange(ExchangeAbstract, *mixin):
     """ KuMex
     """
+
+    warm_path = '/api/v1/timestamp'
+
     def __init__(self, url, key, secret, passphrase, private=False):
         super(KuMexExchange, self).__init__(url)
         self.api_key = key
         self.api_secret = secret
         self.api_passphrase = passphrase
         self.private = private
-        self.idtotopic = {}
+        self.signer = RequestSigner(key, secret, passphrase)
+        self._origin = urljoin(url, '/').rstrip('/')
+        self.refdata = ReferenceData(self)
 
-    @staticmethod
-    async def _check_response_data(response_data):
+    async def release(self):
+        self.refdata.stop()
+        await super(KuMexExchange, self).release()
+
+    @property
+    def return_unique_id(self):
+        """clientOid / bizNo for requests which need a unique id"""
+        return uuid1().hex
+
+    async def _check_response_data(self, response_data):
         if response_data.status == 200:
             try:
                 data = await response_data.json()
             except aiohttp.ContentTypeError:
+                REST_ERRORS.labels(self.label, response_data.status).inc()
                 raise
             if data and 'code' in data:
                 if data.get('code') == '200000':
@@ -56,57 +74,85 @@ class KuMexExchange(ExchangeAbstract, *mixin):
                     else:
                         return data
                 else:
+                    REST_ERRORS.labels(self.label, data['code']).inc()
                     raise Exception("{}-{}".format(response_data.status, await response_data.text()))
         else:
+            REST_ERRORS.labels(self.label, response_data.status).inc()
             raise Exception("{}-{}".format(response_data.status, await response_data.text()))
 
     async def _request(self, method, uri, timeout=30, auth=True, params=None) -> dict:
+        endpoint = None
+        if self.scheduler is not None:
+            # wait for the budget before signing so the timestamp stays fresh
+            endpoint = classify(method, uri, auth)
+            await self.scheduler.acquire(endpoint, PRIORITY[endpoint])
+
+        probe = self.probe
+        if probe is not None:
+            start = time.perf_counter_ns()
+
         uri_path = uri
         data_json = ''
 
-        if method in ['GET', 'DELETE']:
+        if method == 'GET' or method == 'DELETE':
             if params:
-                strl = []
-                for key in sorted(params):
-                    strl.append("{}={}".format(key, params[key]))
-                data_json += '&'.join(strl)
+                data_json = encode_query(params)
                 uri += '?' + data_json
                 uri_path = uri
         else:
             if params:
-                data_json= json.dumps(params)
+                data_json = codec.dumps(params)
                 uri_path = uri + data_json
 
         headers = {}
         if auth:
-            now_time = int(time.time()) * 1000
-            str_to_sign = str(now_time) + method + uri_path
-            sign = base64.b64encode(
-                hmac.new(self.api_secret.encode('utf-8'), str_to_sign.encode('utf-8'), hashlib.sha256).digest())
-            headers = {
-                "KC-API-SIGN": sign.decode('utf-8'),
-                "KC-API-TIMESTAMP": str(now_time),
-                "KC-API-KEY": self.api_key,
-                "KC-API-PASSPHRASE": self.api_passphrase,
-                "Content-Type": "application/json"
-            }
+            headers = self.signer.headers(int(self.clock() * 1000), method, uri_path)
 
-        url = urljoin(self.url, uri)
+        url = self._origin + uri
 
         kwargs = {
             "timeout": timeout,
             "headers": headers,
             }
 
-        if method not in ['GET', 'DELETE']:
+        if method != 'GET' and method != 'DELETE':
             kwargs["data"] = data_json
 
-        async with self.request.request(method, url, **kwargs) as r:
-            return (await self._check_response_data(r))
+        if probe is not None:
+            sent = time.perf_counter_ns()
+            probe.prepare.record(sent - start)
+
+        r = None
+        try:
+            async with self.request.request(method, url, **kwargs) as r:
+                if probe is not None:
+                    headed = time.perf_counter_ns()
+                    probe.send.record(headed - sent)
+                if r.status == 429 and endpoint is not None:
+                    self.scheduler.backoff(endpoint, 1)
+                data = await self._check_response_data(r)
+                if probe is not None:
+                    probe.response.record(time.perf_counter_ns() - headed)
+                return data
+        except Exception as e:
+            if r is None:
+                # connect, TLS or timeout before any response
+                REST_ERRORS.labels(self.label, type(e).__name__).inc()
+            raise
+
+    async def server_time(self):
+        return await self.get_server_timestamp()
 
     def _check_publish_data(self, msg_data):
+        # drop pushes nobody subscribed before paying for the full decode
+        if len(msg_data) >= codec.peek_min:
+            msg_type, msg_topic = codec.peek(msg_data)
+            if (msg_type == PUB_MSG_MESSAGE and msg_topic is not None
+                    and msg_topic not in self.publish_handler):
+                return msg_type, None, None
+
         try:
-            msg_content = json.loads(msg_data)
+            msg_content = codec.loads(msg_data)
         except Exception:
             return None, None, None
 
@@ -115,43 +161,97 @@ class KuMexExchange(ExchangeAbstract, *mixin):
         if msg_type == PUB_MSG_HELLO:
             pass
         elif msg_type == PUB_MSG_ACK:
-            msg_id = msg_content["id"]
-            msg_topic = self.idtotopic.pop(msg_id, None)
+            self._ack(msg_content.get("id"))
         elif msg_type == PUB_MSG_PONG:
             pass
         elif msg_type == PUB_MSG_ERR:
             _LOGGER.error(msg_content['data'])
+            self._ack(msg_content.get("id"), Exception("{}-{}".format(
+                msg_content.get("code"), msg_content.get("data"))))
         elif msg_type is not None:
             msg_topic = msg_content["topic"]
         return msg_type, msg_topic, msg_content
 
-    async def _keepalive(self):
+    def _peek_frame(self, data):
+        msg_type, topic = codec.peek(data)
+        if msg_type != PUB_MSG_MESSAGE or topic is None:
+            return None, None
+        start = data.find('"data"')
+        if start < 0:
+            return None, None
+        return topic, codec.peek_int(data, 'sequence', start)
+
+    def _frame_sequence(self, content):
+        data = content.get('data')
+        if type(data) is not dict:
+            return None
+        return data.get('sequence')
+
+    def _frame_time(self, content):
+        data = content.get('data')
+        if type(data) is not dict:
+            return None
+        ts = data.get('timestamp') or data.get('ts')
+        if not ts:
+            return None
+        # match and ticker pushes are stamped in nanoseconds
+        return ts / 1e6 if ts > 1e15 else ts
+
+    async def _ws_endpoint(self, slot):
+        return await self.get_ws_token(self.private, slot)
+
+    async def _keepalive(self, ws):
         msg = {
-            'id': str(int(time.time() * 1000)),
+            'id': self._msg_id(),
             'type': PUB_MSG_PING
         }
-        await self.websocket.send_json(msg)
+        await ws.send_json(msg)
 
-    async def _sub_request(self, topic):
-        id = str(int(time.time() * 1000))
-        msg = {
-            'id': id,
-            'type': PUB_MSG_SUB,
-            'topic': topic,
-            'privateChannel': self.private,
-            'response': True
-        }
-        self.idtotopic[id] = topic
-        await self.websocket.send_json(msg)
+    async def _sub_request(self, topics, ws):
+        for topic, merged in merge_topics(topics):
+            msg = {
+                'id': self._expect_ack(merged, ws),
+                'type': PUB_MSG_SUB,
+                'topic': topic,
+                'privateChannel': self.private and topic.startswith(PRIVATE_TOPICS),
+                'response': True
+            }
+            await ws.send_json(msg)
 
-    async def _unsub_request(self, topic):
-        id = str(int(time.time() * 1000))
-        msg = {
-            'id': id,
-            'type': PUB_MSG_UNSUB,
-            'topic': topic,
-            'privateChannel': self.private,
-            'response': True
-        }
-        self.idtotopic[id] = topic
-        await self.websocket.send_json(msg)
+    async def _unsub_request(self, topics, ws):
+        for topic, _ in merge_topics(topics):
+            msg = {
+                'id': self._msg_id(),
+                'type': PUB_MSG_UNSUB,
+                'topic': topic,
+                'privateChannel': self.private and topic.startswith(PRIVATE_TOPICS),
+                'response': False
+            }
+            await ws.send_json(msg)
+
+
+def merge_topics(topics):
+    """Join single symbol topics of the same channel
+
+    "/contractMarket/ticker:XBTUSDM" and "/contractMarket/ticker:ETHUSDM"
+    are requested as "/contractMarket/ticker:XBTUSDM,ETHUSDM", at most
+    SUB_SYMBOLS_MAX symbols per request.
+
+    Returns:
+        [(request topic, [merged topics])]
+    """
+    channels = {}
+    requests = []
+    for topic in topics:
+        channel, sep, symbol = topic.partition(':')
+        if not sep or not symbol or ',' in symbol:
+            requests.append((topic, [topic]))
+        else:
+            channels.setdefault(channel, []).append(topic)
+
+    for channel, merged in channels.items():
+        for i in range(0, len(merged), SUB_SYMBOLS_MAX):
+            chunk = merged[i:i + SUB_SYMBOLS_MAX]
+            symbols = ','.join(topic.partition(':')[2] for topic in chunk)
+            requests.append(("%s:%s" % (channel, symbols), chunk))
+    return requests
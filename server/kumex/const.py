@@ -4,4 +4,18 @@ PUB_MSG_ERR = 'error'
 PUB_MSG_PING = 'ping'
 PUB_MSG_PONG = 'pong'
 PUB_MSG_SUB = 'subscribe'
-PUB_MSG_UNSUB = 'unsubscribe'
\ No newline at end of file
+PUB_MSG_UNSUB = 'unsubscribe'
+PUB_MSG_MESSAGE = 'message'
+
+# symbols joined into one subscribe request
+SUB_SYMBOLS_MAX = 100
+
+# universe channels, see market.UniverseTable
+UNIVERSE_TICKER = '/contractMarket/ticker:{symbol}'
+UNIVERSE_INSTRUMENT = '/contract/instrument:{symbol}'
+UNIVERSE_DEPTH = '/contractMarket/level2Depth5:{symbol}'
+UNIVERSE_MATCH = '/contractMarket/execution:{symbol}'
+
+# private channels, need a bullet-private connection
+TRADE_ORDERS = '/contractMarket/tradeOrders'
+PRIVATE_TOPICS = (TRADE_ORDERS, '/contractAccount/', '/contract/position:')
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+
+_LOGGER = logging.getLogger("gateway")
+_LOGGER.setLevel(logging.DEBUG)
+
+
+class OrderGateway:
+    """Concurrent order placement
+
+    Orders of a batch are sent together with bounded concurrency, each one
+    gets a future keyed by its clientOid. A multi-leg entry then costs about
+    the slowest round trip instead of their sum. `start` subscribes the
+    private order channel, its pushes resolve orders as well.
+    """
+
+    def __init__(self, exchange, concurrency=8):
+        self.exchange = exchange
+        self.inflight = {}
+        self._sem = asyncio.Semaphore(concurrency)
+
+    async def start(self):
+        """Subscribe `on_order_message` to the private order channel
+
+        Returns:
+            SubscribeHandle
+        """
+        return await self.exchange.sub_trade_orders(self.on_order_message)
+
+    def submit(self, orders):
+        """Send orders without waiting
+
+        Args:
+            orders: list of dict with symbol, side, lever, size and price,
+                orders without price are market orders. clientOid is
+                generated when missing, other keys are passed through.
+
+        Returns:
+            list of futures resolving to {'clientOid', 'orderId', ...}
+        """
+        loop = asyncio.get_event_loop()
+        futures = []
+        for order in orders:
+            params = dict(order)
+            if not params.get('clientOid'):
+                params['clientOid'] = self.exchange.return_unique_id
+            client_oid = params['clientOid']
+            waiter = loop.create_future()
+            self.inflight[client_oid] = waiter
+            futures.append(waiter)
+            asyncio.ensure_future(self._send(client_oid, params))
+        return futures
+
+    async def place(self, orders, return_exceptions=False):
+        """Send orders and wait for every acknowledgement"""
+        return await asyncio.gather(*self.submit(orders),
+                                    return_exceptions=return_exceptions)
+
+    async def _send(self, client_oid, params):
+        async with self._sem:
+            try:
+                if 'price' in params:
+                    ack = await self.exchange.create_limit_order(**params)
+                else:
+                    ack = await self.exchange.create_market_order(**params)
+            except Exception as e:
+                _LOGGER.error("order %s failed: %s", client_oid, e)
+                self._resolve(client_oid, None, e)
+                return
+        ack = dict(ack)
+        ack.setdefault('clientOid', client_oid)
+        self._resolve(client_oid, ack)
+
+    def _resolve(self, client_oid, ack, error=None):
+        waiter = self.inflight.pop(client_oid, None)
+        if waiter is None or waiter.done():
+            return
+        if error is not None:
+            waiter.set_exception(error)
+        else:
+            waiter.set_result(ack)
+
+    def on_order_message(self, msg_type, content):
+        """`/contractMarket/tradeOrders` callback
+
+        The private push may arrive before the REST response, the first of
+        the two resolves the order.
+        """
+        data = content.get('data') or {}
+        client_oid = data.get('clientOid')
+        if client_oid in self.inflight:
+            self._resolve(client_oid, data)
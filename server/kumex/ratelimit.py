@@ -0,0 +1,40 @@
+from driver.ratelimit import RequestScheduler
+
+ORDER = "order"
+CANCEL = "cancel"
+PRIVATE = "private"
+PUBLIC = "public"
+
+PRIORITY = {
+    ORDER: 0,
+    CANCEL: 0,
+    PRIVATE: 10,
+    PUBLIC: 20,
+}
+
+# (capacity, refill per second), overridden by the exchange "rate_limit" config
+RATE_LIMIT_DEFAULT = {
+    ORDER: (30, 10),
+    CANCEL: (40, 20),
+    PRIVATE: (10, 3),
+    PUBLIC: (30, 10),
+    "total": (60, 20),
+}
+
+
+def classify(method, uri, auth):
+    """Endpoint class of a KuMex REST request"""
+    if uri.startswith('/api/v1/orders') or uri.startswith('/api/v1/stopOrders'):
+        if method == 'POST':
+            return ORDER
+        if method == 'DELETE':
+            return CANCEL
+    return PRIVATE if auth else PUBLIC
+
+
+def create_scheduler(config=None):
+    budgets = dict(RATE_LIMIT_DEFAULT)
+    if config:
+        budgets.update({name: tuple(value) for name, value in config.items()})
+    total = budgets.pop("total", None)
+    return RequestScheduler(budgets, total)
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import time
+
+from utils import AsyncTTLCache
+
+CONTRACT_TTL = 3600
+OFFSET_TTL = 60
+
+_LOGGER = logging.getLogger("refdata")
+_LOGGER.setLevel(logging.DEBUG)
+
+
+class ReferenceData:
+    """KuMex slow-changing reference data
+
+    Contract details (tick size, lot size, fee rates...) are primed in bulk
+    from `get_contracts_list` and refreshed in bulk by a background task,
+    readers or not, `*_now` accessors read the cache without awaiting for
+    use on the hot path.
+    """
+
+    def __init__(self, exchange, ttl=CONTRACT_TTL):
+        self.exchange = exchange
+        self.ttl = ttl
+        self.cache = AsyncTTLCache()
+        self._task = None
+
+    async def prime(self):
+        """Load every active contract at once and keep them refreshed"""
+        contracts = await self.exchange.get_contracts_list()
+        for detail in contracts:
+            self._put_contract(detail)
+        self.cache.put("contracts", contracts, self.ttl, self._load_contracts)
+        self.start()
+        return contracts
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        interval = self.ttl * self.cache.refresh_ahead
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.cache.load("contracts", self._load_contracts, self.ttl)
+            except Exception as e:
+                _LOGGER.warning("contracts refresh failed: %s", e)
+
+    async def _load_contracts(self):
+        contracts = await self.exchange.get_contracts_list()
+        for detail in contracts:
+            self._put_contract(detail)
+        return contracts
+
+    def _put_contract(self, detail):
+        symbol = detail['symbol']
+        self.cache.put(("contract", symbol), detail, self.ttl, self._contract_loader(symbol))
+
+    def _contract_loader(self, symbol):
+        async def _load():
+            # one bulk request refreshes every symbol expiring together
+            contracts = await self.cache.load("contracts", self._load_contracts, self.ttl)
+            for detail in contracts:
+                if detail['symbol'] == symbol:
+                    return detail
+            # not an active contract
+            return await self.exchange.get_contract_detail(symbol)
+        return _load
+
+    async def contracts(self):
+        return await self.cache.get("contracts", self._load_contracts, self.ttl)
+
+    async def contract(self, symbol):
+        return await self.cache.get(("contract", symbol),
+                                    self._contract_loader(symbol), self.ttl)
+
+    def contract_now(self, symbol):
+        """Cached contract detail or None, never waits"""
+        return self.cache.peek(("contract", symbol))
+
+    def fee_rates_now(self, symbol):
+        """Returns:
+            (makerFeeRate, takerFeeRate) or None
+        """
+        detail = self.contract_now(symbol)
+        if detail is None:
+            return None
+        return detail['makerFeeRate'], detail['takerFeeRate']
+
+    def tick_size_now(self, symbol):
+        detail = self.contract_now(symbol)
+        return detail['tickSize'] if detail is not None else None
+
+    async def server_time_offset(self):
+        """Server minus local time in milliseconds"""
+        if self.exchange.time_sync is not None and self.exchange.time_sync.rtt is not None:
+            return self.exchange.time_sync.offset
+        return await self.cache.get("offset", self._load_offset, OFFSET_TTL)
+
+    async def _load_offset(self):
+        # exchange.clock is already corrected, measure against local time
+        clock = time.time
+        if self.exchange.time_sync is not None:
+            clock = self.exchange.time_sync.local
+        sent = clock()
+        server = await self.exchange.get_server_timestamp()
+        received = clock()
+        return server - (sent + received) * 500
@@ -54,11 +54,11 @@ class MarketRequest:
             params['startAt'] = startAt
         if endAt:
             params['endAt'] = endAt
-        if reverse:
+        if reverse is not None:
             params['reverse'] = reverse
         if offset:
             params['offset'] = offset
-        if forward:
+        if forward is not None:
             params['forward'] = forward
         if maxCount:
             params['maxCount'] = maxCount
@@ -113,11 +113,11 @@ class MarketRequest:
             params['startAt'] = startAt
         if endAt:
             params['endAt'] = endAt
-        if reverse:
+        if reverse is not None:
             params['reverse'] = reverse
         if offset:
             params['offset'] = offset
-        if forward:
+        if forward is not None:
             params['forward'] = forward
         if maxCount:
             params['maxCount'] = maxCount
@@ -181,11 +181,11 @@ class MarketRequest:
             params['startAt'] = startAt
         if endAt:
             params['endAt'] = endAt
-        if reverse:
+        if reverse is not None:
             params['reverse'] = reverse
         if offset:
             params['offset'] = offset
-        if forward:
+        if forward is not None:
             params['forward'] = forward
         if maxCount:
             params['maxCount'] = maxCount
@@ -48,11 +48,11 @@ class TradeDataRequest:
             params['startAt'] = startAt
         if endAt:
             params['endAt'] = endAt
-        if reverse:
+        if reverse is not None:
             params['reverse'] = reverse
         if offset:
             params['offset'] = offset
-        if forward:
+        if forward is not None:
             params['forward'] = forward
         if maxCount:
             params['maxCount'] = maxCount
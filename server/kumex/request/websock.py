@@ -1,13 +1,15 @@
 # pylint: disable=all
-import time
+from ..const import (TRADE_ORDERS, UNIVERSE_DEPTH, UNIVERSE_INSTRUMENT, UNIVERSE_MATCH,
+                     UNIVERSE_TICKER)
 
 
 class WebsocketRequest:
 
-    async def get_ws_token(self, private=False):
+    async def get_ws_token(self, private=False, server=0):
         """
         https://docs.kumex.com/#apply-for-connection-token
         :param is_private private or public
+        :param server index into instanceServers, wraps around
         :return:
         """
         uri = '/api/v1/bullet-public'
@@ -15,15 +17,16 @@ class WebsocketRequest:
             uri = '/api/v1/bullet-private'
 
         ws_detail = await self._request('POST', uri, auth=private)
-        ws_connect_id = str(int(time.time() * 1000))
+        ws_connect_id = str(int(self.clock() * 1000))
         token = ws_detail['token']
-        endpoint = ws_detail['instanceServers'][0]['endpoint']
+        instance = ws_detail['instanceServers'][server % len(ws_detail['instanceServers'])]
+        endpoint = instance['endpoint']
         ws_endpoint = f"{endpoint}?token={token}&connectId={ws_connect_id}"
         if private:
             ws_endpoint += '&acceptUserMessage=true'
     
-        ws_encrypt = ws_detail['instanceServers'][0]['encrypt']
-        ws_timeout = int(ws_detail['instanceServers'][0]['pingTimeout'] / 1000) - 2
+        ws_encrypt = instance['encrypt']
+        ws_timeout = int(instance['pingTimeout'] / 1000) - 2
 
         return ws_endpoint, ws_encrypt, ws_timeout
 
@@ -40,3 +43,55 @@ class WebsocketRequest:
         """
         topic = "/contract/instrument:{symbol}".format(symbol=symbol)
         return await self.subscribe(topic, cb)
+
+    async def sub_execution(self, symbol, cb):
+        """成交记录
+
+        https://docs.kucoin.com/futures/#execution-data
+        """
+        topic = UNIVERSE_MATCH.format(symbol=symbol)
+        return await self.subscribe(topic, cb)
+
+    async def sub_level2(self, symbol, cb):
+        """Level 2 盘口增量
+
+        https://docs.kucoin.com/futures/#level-2-market-data
+        """
+        topic = "/contractMarket/level2:{symbol}".format(symbol=symbol)
+        return await self.subscribe(topic, cb)
+
+    async def sub_level3(self, symbol, cb):
+        """Level 3 逐笔委托
+
+        https://docs.kucoin.com/futures/#full-matching-engine-data-level-3
+        """
+        topic = "/contractMarket/level3:{symbol}".format(symbol=symbol)
+        return await self.subscribe(topic, cb)
+
+    async def sub_level2_depth5(self, symbol, cb):
+        """Level 2 五档盘口
+
+        https://docs.kucoin.com/futures/#level2-5-best-ask-bid-orders
+        """
+        topic = UNIVERSE_DEPTH.format(symbol=symbol)
+        return await self.subscribe(topic, cb)
+
+    async def sub_trade_orders(self, cb):
+        """订单变更 (私有)
+
+        https://docs.kucoin.com/futures/#trade-orders
+        """
+        return await self.subscribe(TRADE_ORDERS, cb)
+
+    async def sub_universe(self, symbols, cb,
+                           channels=(UNIVERSE_TICKER, UNIVERSE_INSTRUMENT, UNIVERSE_DEPTH)):
+        """多合约订阅
+
+        Every channel of every symbol is subscribed in batched requests,
+        see market.UniverseTable for routing pushes into rows.
+
+        Returns:
+            list of SubscribeHandle
+        """
+        topics = [channel.format(symbol=symbol) for channel in channels for symbol in symbols]
+        return await self.subscribe_many(topics, cb)
@@ -0,0 +1,52 @@
+import base64
+import hashlib
+import hmac
+
+
+class RequestSigner:
+    """KC-API request signer
+
+    The HMAC is keyed once and copied per request, headers are filled from a
+    static template instead of being rebuilt on every call.
+    """
+
+    __slots__ = ("_mac", "_template")
+
+    def __init__(self, key, secret, passphrase):
+        self._mac = hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+        self._template = {
+            "KC-API-KEY": key,
+            "KC-API-PASSPHRASE": passphrase,
+            "Content-Type": "application/json"
+        }
+
+    def sign(self, str_to_sign):
+        mac = self._mac.copy()
+        mac.update(str_to_sign.encode('utf-8'))
+        return base64.b64encode(mac.digest()).decode('utf-8')
+
+    def headers(self, now_time, method, uri_path):
+        """Authenticated request headers
+
+        Args:
+            now_time: timestamp in milliseconds
+            method: http method
+            uri_path: path with query string or json body appended
+        """
+        timestamp = str(now_time)
+        headers = self._template.copy()
+        headers["KC-API-SIGN"] = self.sign(timestamp + method + uri_path)
+        headers["KC-API-TIMESTAMP"] = timestamp
+        return headers
+
+
+def encode_query(params):
+    """Sorted `k=v&...` query string, the form KuMex signs"""
+    return '&'.join([key + '=' + _query_value(params[key]) for key in sorted(params)])
+
+
+def _query_value(value):
+    # the API reads booleans as true / false
+    if value is True or value is False:
+        return 'true' if value else 'false'
+    return str(value)
@@ -0,0 +1,123 @@
+"""日志管道
+
+Records are put on a queue by the caller and formatted and written by a
+listener thread, the event loop never touches a stream. Only the message
+is interpolated by the caller, so arguments mutated after the logging call
+are logged as they were; timestamps, json encoding and output are left to
+the listener.
+
+config:
+    level: lowest level written, whatever the logger levels
+    format: "json" or "text"
+    file: output path, stderr if not set
+    sample: {logger: n}, keep one of n records below WARNING
+"""
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+_TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener = None
+_samplers = []
+
+
+class JsonFormatter(logging.Formatter):
+    """One json object per line"""
+
+    def format(self, record):
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Keep one of every `n` records below WARNING"""
+
+    def __init__(self, n):
+        super(SampleFilter, self).__init__()
+        self.n = max(1, int(n))
+        self.seen = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        self.seen += 1
+        return (self.seen - 1) % self.n == 0
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler leaving record formatting to the listener thread"""
+
+    def prepare(self, record):
+        # snapshot the message, the arguments may change once we return
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup(config=None):
+    """Install the queue pipeline on the root logger
+
+    Returns:
+        the running QueueListener
+    """
+    global _listener
+    config = config or {}
+    shutdown()
+
+    if config.get("file"):
+        output = logging.FileHandler(config["file"], encoding="utf-8")
+    else:
+        output = logging.StreamHandler(sys.stderr)
+    if config.get("format", "text") == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(_TEXT_FORMAT))
+
+    # module loggers pin DEBUG on themselves, so the level is enforced by
+    # the handlers: records below it are never enqueued
+    level = config.get("level", "DEBUG")
+    output.setLevel(level)
+    enqueue = DeferredQueueHandler(queue.SimpleQueue())
+    enqueue.setLevel(level)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(enqueue)
+    root.setLevel(level)
+
+    for name, n in config.get("sample", {}).items():
+        logger = logging.getLogger(name)
+        sampler = SampleFilter(n)
+        logger.addFilter(sampler)
+        _samplers.append((logger, sampler))
+
+    _listener = logging.handlers.QueueListener(enqueue.queue, output)
+    _listener.start()
+    return _listener
+
+
+def shutdown():
+    """Flush pending records, stop the listener and remove the samplers"""
+    global _listener
+    while _samplers:
+        logger, sampler = _samplers.pop()
+        logger.removeFilter(sampler)
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+_samplers = []
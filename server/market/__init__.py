@@ -0,0 +1,4 @@
+from .ticks import TickRing, TickStore
+from .universe import UniverseTable
+
+__all__ = ["TickRing", "TickStore", "UniverseTable"]
@@ -0,0 +1,180 @@
+"""列式 tick 存储
+
+Each (symbol, stream) keeps a fixed-capacity ring per field. Rings are
+double-written: a value lands at `pos` and `pos + capacity`, so the last
+n values are always one contiguous slice and windows are views, never
+copies. Memory is allocated once, capacity * fields * 16 bytes per ring.
+"""
+from array import array
+
+from kumex.const import UNIVERSE_INSTRUMENT, UNIVERSE_MATCH, UNIVERSE_TICKER
+
+MARK = "mark"
+FUNDING = "funding"
+TICKER = "ticker"
+MATCH = "match"
+
+STREAM_FIELDS = {
+    MARK: ("ts", "mark", "index"),
+    FUNDING: ("ts", "rate"),
+    TICKER: ("ts", "bid", "bid_size", "ask", "ask_size"),
+    MATCH: ("ts", "price", "size", "side"),     # side 1 buy, -1 sell
+}
+
+
+class TickRing:
+    """Fixed-capacity columnar ring
+
+    Args:
+        capacity: values kept per field
+        fields: column names, `append` takes values in this order
+    """
+
+    def __init__(self, capacity, fields):
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self.columns = {name: array('d', [0.0]) * (capacity * 2) for name in self.fields}
+        self._columns = [self.columns[name] for name in self.fields]
+        self.pos = 0
+        self.total = 0
+        self._weights = {}
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, *values):
+        pos = self.pos
+        mirror = pos + self.capacity
+        for column, value in zip(self._columns, values):
+            column[pos] = value
+            column[mirror] = value
+        pos += 1
+        self.pos = pos if pos < self.capacity else 0
+        self.total += 1
+
+    def last(self, field):
+        if not self.total:
+            return None
+        return self.columns[field][self.pos + self.capacity - 1]
+
+    def _bounds(self, n):
+        size = len(self)
+        n = size if n is None or n > size else n
+        end = self.pos + self.capacity
+        return end - n, end
+
+    def window(self, field, n=None):
+        """memoryview over the last n values, oldest first"""
+        start, end = self._bounds(n)
+        return memoryview(self.columns[field])[start:end]
+
+    def view(self, field, n=None):
+        """NumPy view over the last n values, oldest first
+
+        The view aliases the ring and is overwritten as values arrive, copy
+        it to keep it past the next append.
+        """
+        import numpy as np
+        start, end = self._bounds(n)
+        return np.frombuffer(self.columns[field], dtype=np.float64,
+                             count=end - start, offset=start * 8)
+
+    def mean(self, field, n=None):
+        values = self.view(field, n)
+        return float(values.mean()) if len(values) else float("nan")
+
+    def std(self, field, n=None):
+        values = self.view(field, n)
+        return float(values.std()) if len(values) else float("nan")
+
+    def ewma(self, field, alpha, n=None):
+        """Exponentially weighted mean of the last n values, newest weighs most"""
+        import numpy as np
+        values = self.view(field, n)
+        size = len(values)
+        if not size:
+            return float("nan")
+        # one full length weight vector per alpha, shorter windows take its tail
+        weights = self._weights.get(alpha)
+        if weights is None:
+            weights = self._weights[alpha] = (1 - alpha) ** np.arange(
+                self.capacity - 1, -1, -1, dtype=np.float64)
+        weights = weights[-size:]
+        return float(values.dot(weights) / weights.sum())
+
+
+class TickStore:
+    """Tick history of instrument, ticker and match pushes
+
+    Args:
+        capacity: values kept per symbol, stream and field
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.rings = {}
+        self._routes = {}
+
+    def ring(self, symbol, stream):
+        """TickRing of a symbol stream, see STREAM_FIELDS"""
+        key = (symbol, stream)
+        ring = self.rings.get(key)
+        if ring is None:
+            ring = self.rings[key] = TickRing(self.capacity, STREAM_FIELDS[stream])
+        return ring
+
+    async def track(self, exchange, symbols, streams=(MARK, TICKER, MATCH)):
+        """Subscribe the streams of `symbols` into the store
+
+        Returns:
+            list of SubscribeHandle
+        """
+        topics = {self.on_instrument: [], self.on_ticker: [], self.on_match: []}
+        for symbol in symbols:
+            if MARK in streams or FUNDING in streams:
+                topic = UNIVERSE_INSTRUMENT.format(symbol=symbol)
+                self._routes[topic] = (self.ring(symbol, MARK), self.ring(symbol, FUNDING))
+                topics[self.on_instrument].append(topic)
+            if TICKER in streams:
+                topic = UNIVERSE_TICKER.format(symbol=symbol)
+                self._routes[topic] = self.ring(symbol, TICKER)
+                topics[self.on_ticker].append(topic)
+            if MATCH in streams:
+                topic = UNIVERSE_MATCH.format(symbol=symbol)
+                self._routes[topic] = self.ring(symbol, MATCH)
+                topics[self.on_match].append(topic)
+
+        handles = []
+        for cb, cb_topics in topics.items():
+            if cb_topics:
+                handles.extend(await exchange.subscribe_many(cb_topics, cb))
+        return handles
+
+    def on_instrument(self, msg_type, content):
+        rings = self._routes.get(content.get('topic'))
+        if rings is None:
+            return
+        data = content['data']
+        if content.get('subject') == "mark.index.price":
+            rings[0].append(float(data['timestamp']), float(data['markPrice']),
+                            float(data['indexPrice']))
+        elif content.get('subject') == "funding.rate":
+            rings[1].append(float(data['timestamp']), float(data['fundingRate']))
+
+    def on_ticker(self, msg_type, content):
+        ring = self._routes.get(content.get('topic'))
+        if ring is None:
+            return
+        data = content['data']
+        # prices come as strings, ts in nanoseconds
+        ring.append(float(data['ts']) / 1e6, float(data['bestBidPrice']),
+                    float(data['bestBidSize']), float(data['bestAskPrice']),
+                    float(data['bestAskSize']))
+
+    def on_match(self, msg_type, content):
+        ring = self._routes.get(content.get('topic'))
+        if ring is None:
+            return
+        data = content['data']
+        ring.append(float(data['ts']) / 1e6, float(data['price']), float(data['size']),
+                    1.0 if data['side'] == 'buy' else -1.0)
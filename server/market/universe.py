@@ -0,0 +1,136 @@
+"""全市场行情表
+
+Ticker, instrument and level2Depth5 pushes of many contracts are written
+into preallocated columns, one row per symbol. A field is one array('d')
+over all rows, `view` wraps it as a NumPy array without copying, so a
+cross-contract scan is a single vectorized pass over the latest values.
+"""
+from array import array
+
+from kumex.const import (UNIVERSE_DEPTH,
+                         UNIVERSE_INSTRUMENT,
+                         UNIVERSE_TICKER)
+
+DEPTH = 5
+
+FIELDS = (
+    "bid", "bid_size", "ask", "ask_size",       # ticker best quote
+    "last", "last_size", "ts",                  # ticker last trade, ms
+    "mark", "index", "funding",                 # instrument
+)
+DEPTH_FIELDS = ("bids", "bid_sizes", "asks", "ask_sizes")
+
+NAN = float("nan")
+
+
+class UniverseTable:
+    """Latest market state of a fixed set of symbols
+
+    Args:
+        symbols: row order
+        channels: subset of (UNIVERSE_TICKER, UNIVERSE_INSTRUMENT, UNIVERSE_DEPTH)
+        on_update: called with the row after every applied push
+    """
+
+    def __init__(self, symbols, channels=(UNIVERSE_TICKER, UNIVERSE_INSTRUMENT, UNIVERSE_DEPTH),
+                 on_update=None):
+        self.symbols = list(symbols)
+        self.rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+        self.channels = tuple(channels)
+        self.on_update = on_update
+        self.handles = []
+
+        size = len(self.symbols)
+        self.columns = {name: array('d', [NAN]) * size for name in FIELDS}
+        for name in DEPTH_FIELDS:
+            self.columns[name] = array('d', [NAN]) * (size * DEPTH)
+        # every push updates this stamp, scans compare it to skip stale rows
+        self.updates = array('q', [0]) * size
+
+        self._routes = {}
+        appliers = {UNIVERSE_TICKER: self._ticker,
+                    UNIVERSE_INSTRUMENT: self._instrument,
+                    UNIVERSE_DEPTH: self._depth}
+        for channel in self.channels:
+            for symbol, row in self.rows.items():
+                self._routes[channel.format(symbol=symbol)] = (appliers[channel], row)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @classmethod
+    async def from_contracts(cls, exchange, **kwargs):
+        """Table over every active contract of the exchange"""
+        contracts = await exchange.refdata.contracts()
+        return cls([detail['symbol'] for detail in contracts], **kwargs)
+
+    async def subscribe(self, exchange):
+        """Subscribe every channel of every symbol in one round trip"""
+        self.handles = await exchange.sub_universe(self.symbols, self.on_message, self.channels)
+        return self.handles
+
+    def unsubscribe(self):
+        for handle in self.handles:
+            handle.unsubscribe()
+        self.handles = []
+
+    def on_message(self, msg_type, content):
+        route = self._routes.get(content.get('topic'))
+        if route is None:
+            return
+        apply, row = route
+        apply(row, content['data'])
+        self.updates[row] += 1
+        if self.on_update is not None:
+            self.on_update(row)
+
+    def _ticker(self, row, data):
+        # prices come as strings
+        columns = self.columns
+        columns["bid"][row] = float(data["bestBidPrice"])
+        columns["bid_size"][row] = float(data["bestBidSize"])
+        columns["ask"][row] = float(data["bestAskPrice"])
+        columns["ask_size"][row] = float(data["bestAskSize"])
+        columns["last"][row] = float(data["price"])
+        columns["last_size"][row] = float(data["size"])
+        # nanoseconds
+        columns["ts"][row] = float(data["ts"]) / 1e6
+
+    def _instrument(self, row, data):
+        if "markPrice" in data:
+            self.columns["mark"][row] = float(data["markPrice"])
+            self.columns["index"][row] = float(data["indexPrice"])
+        elif "fundingRate" in data:
+            self.columns["funding"][row] = float(data["fundingRate"])
+
+    def _depth(self, row, data):
+        columns = self.columns
+        base = row * DEPTH
+        for side, prices, sizes in (("bids", columns["bids"], columns["bid_sizes"]),
+                                    ("asks", columns["asks"], columns["ask_sizes"])):
+            levels = data[side]
+            for i in range(DEPTH):
+                if i < len(levels):
+                    prices[base + i] = float(levels[i][0])
+                    sizes[base + i] = float(levels[i][1])
+                else:
+                    prices[base + i] = NAN
+                    sizes[base + i] = 0.0
+
+    def get(self, symbol, field):
+        return self.columns[field][self.rows[symbol]]
+
+    def view(self, field):
+        """NumPy view of a field over all rows, shared with the table
+
+        Depth fields are shaped (rows, DEPTH). Values change under the view
+        as pushes arrive, copy it to keep a snapshot.
+        """
+        import numpy as np
+        column = np.frombuffer(self.columns[field], dtype=np.float64)
+        if field in DEPTH_FIELDS:
+            return column.reshape(len(self.symbols), DEPTH)
+        return column
+
+    def views(self):
+        return {field: self.view(field) for field in self.columns}
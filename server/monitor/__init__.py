@@ -0,0 +1,6 @@
+from .latency import LatencyHistogram
+from .metrics import REGISTRY, Counter, Gauge, MetricRegistry
+from .stages import StageProbe
+
+__all__ = ["Counter", "Gauge", "LatencyHistogram", "MetricRegistry",
+           "REGISTRY", "StageProbe"]
@@ -0,0 +1,93 @@
+"""延迟统计"""
+
+# sub-buckets per power of two, ~6% relative precision
+_SUB_BITS = 4
+_SUB_HALF = 1 << (_SUB_BITS - 1)
+_SUB_COUNT = 1 << _SUB_BITS
+
+# values above ~18 minutes (ns) are clamped into the last bucket
+_MAX_BITS = 40
+_MAX_VALUE = (1 << _MAX_BITS) - 1
+_BUCKETS = ((_MAX_BITS - _SUB_BITS + 1) << (_SUB_BITS - 1)) + _SUB_COUNT
+
+
+def _index(value):
+    if value < _SUB_COUNT:
+        return value
+    shift = value.bit_length() - _SUB_BITS
+    return (shift << (_SUB_BITS - 1)) + (value >> shift)
+
+
+def _lower(index):
+    if index < _SUB_COUNT:
+        return index
+    shift = (index >> (_SUB_BITS - 1)) - 1
+    return (index - (shift << (_SUB_BITS - 1))) << shift
+
+
+class LatencyHistogram:
+    """Fixed-size log-linear latency histogram
+
+    Buckets are preallocated, recording a sample is a couple of integer
+    operations and never allocates.
+    """
+
+    __slots__ = ("name", "buckets", "count", "total", "max")
+
+    def __init__(self, name=""):
+        self.name = name
+        self.buckets = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        """Record a sample
+
+        Args:
+            value: latency in nanoseconds
+        """
+        if value < 0:
+            value = 0
+        elif value > _MAX_VALUE:
+            value = _MAX_VALUE
+        self.buckets[_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct):
+        """Lower bound of the bucket holding the pct-th percentile (ns)"""
+        if not self.count:
+            return 0
+        rank = max(1, int(self.count * pct / 100.0 + 0.5))
+        seen = 0
+        for index, cnt in enumerate(self.buckets):
+            seen += cnt
+            if seen >= rank:
+                return _lower(index)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def reset(self):
+        buckets = self.buckets
+        for index in range(_BUCKETS):
+            buckets[index] = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def summary(self):
+        """Returns:
+            count, mean, p50, p99, max (ns)
+        """
+        return (self.count, self.mean(), self.percentile(50),
+                self.percentile(99), self.max)
+
+    def __str__(self):
+        count, mean, p50, p99, peak = self.summary()
+        return "%s count=%d mean=%.1fus p50=%.1fus p99=%.1fus max=%.1fus" % (
+            self.name, count, mean / 1e3, p50 / 1e3, p99 / 1e3, peak / 1e3)
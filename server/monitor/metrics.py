@@ -0,0 +1,127 @@
+"""运行指标
+
+Prometheus text exposition of counters and gauges. A labelled child is
+created once and kept by its user, counting an event is then a single
+attribute increment without building labels or dicts.
+"""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class _Child:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Metric:
+    """A metric family, one child per label values"""
+
+    kind = "untyped"
+
+    def __init__(self, name, doc, labels=()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labels)
+        self.children = {}
+        if not self.labelnames:
+            self.children[()] = _Child()
+
+    def labels(self, *values):
+        """Child for the label values, keep it instead of calling per event"""
+        values = tuple(str(v) for v in values)
+        child = self.children.get(values)
+        if child is None:
+            assert len(values) == len(self.labelnames), "%s labels mismatch" % self.name
+            child = self.children[values] = _Child()
+        return child
+
+    def inc(self, amount=1):
+        self.children[()].value += amount
+
+    def set(self, value):
+        self.children[()].value = value
+
+    def clear(self):
+        self.children.clear()
+        if not self.labelnames:
+            self.children[()] = _Child()
+
+    def render(self, lines):
+        lines.append("# HELP %s %s" % (self.name, self.doc))
+        lines.append("# TYPE %s %s" % (self.name, self.kind))
+        for values, child in self.children.items():
+            if values:
+                pairs = ",".join('%s="%s"' % (k, _escape(v))
+                                 for k, v in zip(self.labelnames, values))
+                lines.append("%s{%s} %s" % (self.name, pairs, child.value))
+            else:
+                lines.append("%s %s" % (self.name, child.value))
+
+
+class Counter(Metric):
+    kind = "counter"
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+
+class MetricRegistry:
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, name, doc, labels=()):
+        return self._add(Counter(name, doc, labels))
+
+    def gauge(self, name, doc, labels=()):
+        return self._add(Gauge(name, doc, labels))
+
+    def on_collect(self, callback):
+        """`callback()` refreshes gauges right before rendering"""
+        self.collectors.append(callback)
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        for callback in self.collectors:
+            callback()
+        lines = []
+        for metric in self.metrics:
+            metric.render(lines)
+        lines.append("")
+        return "\n".join(lines)
+
+
+REGISTRY = MetricRegistry()
+
+WS_RECONNECTS = REGISTRY.counter(
+    "hibox_ws_reconnects_total", "Websocket reconnects", ("exchange",))
+WS_LINKS = REGISTRY.gauge(
+    "hibox_ws_links", "Connected websocket links, 0 while the feed is down", ("exchange",))
+WS_MESSAGES = REGISTRY.counter(
+    "hibox_ws_messages_total", "Dispatched websocket messages", ("exchange", "topic"))
+WS_FEED_WINS = REGISTRY.counter(
+    "hibox_ws_feed_wins_total", "Messages first delivered by a redundant link", ("exchange", "link"))
+WS_FEED_DROPS = REGISTRY.counter(
+    "hibox_ws_feed_drops_total", "Redundant link copies dropped as duplicate or out of order",
+    ("exchange", "link"))
+REST_ERRORS = REGISTRY.counter(
+    "hibox_rest_errors_total", "REST responses failed", ("exchange", "code"))
+STRATEGY_STATE = REGISTRY.gauge(
+    "hibox_strategy_state", "Strategies per state", ("strategy", "state"))
@@ -0,0 +1,47 @@
+"""本地监控接口"""
+import logging
+
+from aiohttp import web
+
+from . import stages
+from .metrics import CONTENT_TYPE, REGISTRY
+
+_LOGGER = logging.getLogger("monitor")
+_LOGGER.setLevel(logging.DEBUG)
+
+
+class StatsServer:
+    """Local HTTP endpoint for runtime statistics
+
+    GET /stats returns the stage latency histograms as json, GET /metrics
+    the counters and gauges in Prometheus text format.
+    """
+
+    def __init__(self, host="127.0.0.1", port=9108):
+        self.host = host
+        self.port = port
+        self.app = web.Application()
+        self.app.router.add_get("/stats", self._stats)
+        self.app.router.add_get("/metrics", self._metrics)
+        self._runner = None
+
+    def add_get(self, path, handler):
+        self.app.router.add_get(path, handler)
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        _LOGGER.info("stats server on %s:%d", self.host, self.port)
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _stats(self, request):
+        return web.json_response(stages.snapshot())
+
+    async def _metrics(self, request):
+        return web.Response(body=REGISTRY.render().encode("utf-8"),
+                            headers={"Content-Type": CONTENT_TYPE})
@@ -0,0 +1,66 @@
+"""分阶段延迟
+
+Probes are only created once `enable` is called. Instrumented code keeps
+`probe = None` otherwise, and a disabled hot path costs one attribute test.
+"""
+from .latency import LatencyHistogram
+
+# websocket frame: exchange push time -> receipt, decode, subscriber callbacks
+# REST request: signing and encoding, until response headers, body and checks
+EXCHANGE_STAGES = ("receive", "decode", "dispatch", "prepare", "send", "response")
+STRATEGY_STAGES = ("analysis",)
+
+_enabled = False
+_probes = {}
+
+
+class StageProbe:
+    """One histogram per stage, reachable as attribute"""
+
+    def __init__(self, name, stages):
+        self.name = name
+        self.stages = stages
+        for stage in stages:
+            setattr(self, stage, LatencyHistogram("%s.%s" % (name, stage)))
+
+    def histograms(self):
+        return [getattr(self, stage) for stage in self.stages]
+
+    def reset(self):
+        for hist in self.histograms():
+            hist.reset()
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def enabled():
+    return _enabled
+
+
+def probe(name, stages):
+    """Shared probe for `name`, None while disabled"""
+    if not _enabled:
+        return None
+    obj = _probes.get(name)
+    if obj is None:
+        obj = _probes[name] = StageProbe(name, stages)
+    return obj
+
+
+def probes():
+    return list(_probes.values())
+
+
+def snapshot():
+    """{probe: {stage: {count, mean, p50, p99, max}}} in microseconds"""
+    result = {}
+    for obj in _probes.values():
+        stages = result[obj.name] = {}
+        for stage in obj.stages:
+            count, mean, p50, p99, peak = getattr(obj, stage).summary()
+            stages[stage] = {"count": count, "mean": mean / 1e3, "p50": p50 / 1e3,
+                             "p99": p99 / 1e3, "max": peak / 1e3}
+    return result
@@ -1,7 +1,11 @@
 import asyncio
+import logging
+import time
 
-from const import EXCHANGE_KUMEX
-from kumex import KuMexExchange
+from monitor import LatencyHistogram, stages
+from tradecore.registry import ExchangeRegistry
+
+_LOGGER = logging.getLogger("strategy")
 
 
 class StrategyBase:
@@ -11,38 +15,84 @@ class StrategyBase:
     IDLE = 2
     CLOSE = 3
 
+    STATE_NAMES = {PENDING: "pending", IDLE: "idle", CLOSE: "close"}
+
     def __init__(self):
         self.state = self.IDLE
         self.exchanges = []
+        self.handles = []
+        self._wakeup = asyncio.Event()
+        self._tick_ns = 0
+        self.decision_latency = LatencyHistogram(type(self).__name__)
+        self.probe = stages.probe(type(self).__name__, stages.STRATEGY_STAGES)
 
     async def setup(self, config=None):
         """初始化"""
+        registry = ExchangeRegistry()
         for exchange in config:
-            name = exchange['name']
-            if name == EXCHANGE_KUMEX:
-                kumex = KuMexExchange(exchange['url'],
-                                      exchange['key'],
-                                      exchange['secret'],
-                                      exchange['passphrase'])
-                kumex.setup()
-                self.exchanges.append(kumex)
-                await kumex.ws_connect(*await kumex.get_ws_token())
+            self.exchanges.append(await registry.acquire(exchange))
 
     async def init(self):
         """初始化"""
 
     async def close(self):
         """关闭策略"""
+        for handle in self.handles:
+            handle.unsubscribe()
+        self.handles = []
+
+        registry = ExchangeRegistry()
         for obj in self.exchanges:
-            await obj.release()
+            await registry.release(obj)
+        self.exchanges = []
+
+        self.state = self.CLOSE
+        self._wakeup.set()
+
+    def notify(self):
+        """行情到达，标记策略待执行
+
+        Called from websocket callbacks. A burst of ticks before the next run
+        is coalesced into a single execution.
+        """
+        if not self._tick_ns:
+            self._tick_ns = time.perf_counter_ns()
+        self._wakeup.set()
+
+    async def run(self):
+        """事件驱动执行
+
+        Wait for `notify` and execute at once instead of polling. An
+        exception left by `handle_exception` stops this strategy only, its
+        state stays PENDING as in poll mode.
+        """
+        while self.state != self.CLOSE:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.state == self.CLOSE:
+                break
+            try:
+                await self.execute()
+            except Exception as e:
+                _LOGGER.exception("%s stopped: %s", type(self).__name__, e)
+                break
 
     async def execute(self):
         """执行策略"""
         assert self.state == self.IDLE, "strategt executing"
 
+        if self._tick_ns:
+            self.decision_latency.record(time.perf_counter_ns() - self._tick_ns)
+            self._tick_ns = 0
+
         self.state = self.PENDING
         try:
-            await self.analysis()
+            if self.probe is None:
+                await self.analysis()
+            else:
+                start = time.perf_counter_ns()
+                await self.analysis()
+                self.probe.analysis.record(time.perf_counter_ns() - start)
         except Exception as e:
             return await self.handle_exception(e)
         # Stop execution when exception occurs
@@ -52,6 +102,17 @@ class StrategyBase:
         """分析"""
         raise NotImplementedError
 
+    def signals(self, columns):
+        """向量化信号，供回测使用
+
+        Args:
+            columns: {field: numpy column}, see backtest.load_klines
+
+        Returns:
+            target position per bar, 1 long, -1 short, 0 flat
+        """
+        raise NotImplementedError
+
     async def handle_exception(self, e):
         """"异常处理
         
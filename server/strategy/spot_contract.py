@@ -53,6 +53,9 @@
 import logging
 
 from kumex.const import PUB_MSG_ACK
+from kumex.gateway import OrderGateway
+from market import TickStore
+from market.ticks import MARK
 from .base import StrategyBase
 
 _LOGGER = logging.getLogger("SC")
@@ -60,23 +63,32 @@ _LOGGER = logging.getLogger("SC")
 
 class SpotContract(StrategyBase):
 
+    MIN_RATIO = 10      # 最低收益
+
     def __init__(self):
         super(SpotContract, self).__init__()
         self.cur_index_price = 0
         self.cur_mark_price = 0
         self.maker_feerate = 0
         self.taker_feerate = 0
+        self.ticks = TickStore()
 
     @property
     def kumex(self):
         return self.exchanges[0]
 
     async def init(self):
+        self.gateway = OrderGateway(self.kumex)
+        self.handles.append(await self.gateway.start())
+        # rolling mark/index history, ticks.ring('XBTUSDM', MARK)
+        self.handles.extend(await self.ticks.track(self.kumex, ['XBTUSDM'], (MARK,)))
         self.instrument_handle = await self.kumex.sub_instrument(
             'XBTUSDM', self._instrument)
+        self.handles.append(self.instrument_handle)
 
-        data = await self.kumex.get_contract_detail('XBTUSDM')
-        self.maker_rate = data["makerFeeRate"]
+        data = await self.kumex.refdata.contract('XBTUSDM')
+        self.maker_feerate = data["makerFeeRate"]
+        self.taker_feerate = data["takerFeeRate"]
         _LOGGER.debug("contract detail: %s", data)
 
         _LOGGER.debug("overview btc: %s", await self.kumex.get_account_overview('XBT'))
@@ -87,9 +99,10 @@ class SpotContract(StrategyBase):
         sub = data["subject"]
         if sub == "mark.index.price":   # 当前最新价格
             self.cur_index_price = data["data"]["indexPrice"]
-            self.cur_mark_price = data["data"]["makrPrice"]
+            self.cur_mark_price = data["data"]["markPrice"]
         elif sub == "funding.rate":     # 资金费率
             pass
+        self.notify()
 
     async def analysis(self):
         """分析市场实时行情"""
@@ -100,6 +113,26 @@ class SpotContract(StrategyBase):
         ratio = abs(basic) / self.cur_mark_price
         if ratio <= self.taker_feerate:    # 成本控制
             return
-        if ratio < 10:                  # 收益控制
-            return        
-        await self.kumex.create_limit_order(self, 'XBTUSDM', 'buy', 100, 1, self.cur_mark_price)
+        if ratio < self.MIN_RATIO:      # 收益控制
+            return
+        await self.gateway.place([
+            {'symbol': 'XBTUSDM', 'side': 'buy', 'lever': 100, 'size': 1,
+             'price': self.cur_mark_price},
+        ])
+
+    def signals(self, columns):
+        """基差信号
+
+        Needs the contract close as `close` and the index close as `index`.
+        Enter when the same conditions as `analysis` hold, flat once the
+        basis is back to zero or positive.
+        """
+        import numpy as np
+        from backtest import forward_fill
+
+        mark = columns["close"]
+        basic = columns["index"] - mark
+        ratio = np.abs(basic) / mark
+        enter = (basic < 0) & (ratio > self.taker_feerate) & (ratio >= self.MIN_RATIO)
+        leave = basic >= 0
+        return forward_fill(np.where(enter, 1.0, np.where(leave, 0.0, np.nan)))
@@ -1 +1,2 @@
-from .control import TradeController
\ No newline at end of file
+from .control import TradeController
+from .registry import ExchangeRegistry
@@ -1,39 +1,189 @@
 import asyncio
 import logging
 import json
+import multiprocessing
 
-from const import SPOT_CONTRACT
+import logs
+from const import SPOT_CONTRACT, SCHEDULE_POLL, SCHEDULE_EVENT
+from monitor import REGISTRY, stages
+from monitor.metrics import STRATEGY_STATE
 from utils import Singleton
 
+from .registry import ExchangeRegistry
+
 _LOGGER = logging.getLogger("control")
 _LOGGER.setLevel(logging.DEBUG)
 
 
+async def load_strategy(detail):
+    """Create, connect and initialize a strategy from its config entry"""
+    name = detail['name']
+
+    if name == SPOT_CONTRACT:
+        from strategy.spot_contract import SpotContract
+        sc = SpotContract()
+        await sc.setup(detail['exchange'])
+        await sc.init()
+        return sc
+
+    _LOGGER.error("unknown strategy %s", name)
+    return None
+
+
+async def run_strategies(strategies):
+    """Run strategies in event mode until all of them stop
+
+    A failing strategy is logged and never cancels the others.
+    """
+    results = await asyncio.gather(*[dec.run() for dec in strategies],
+                                   return_exceptions=True)
+    for dec, result in zip(strategies, results):
+        if isinstance(result, BaseException):
+            _LOGGER.error("strategy %s failed: %r", type(dec).__name__, result)
+
+
+async def report_latency(strategies, interval, label):
+    """定期输出 tick 到决策及各阶段的延迟分布
+
+    Runs in every process running strategies, until `strategies` is empty.
+    """
+    while strategies:
+        await asyncio.sleep(interval)
+        for dec in strategies:
+            _LOGGER.info("[%s] tick-to-decision %s", label, dec.decision_latency)
+        for exchange in ExchangeRegistry().exchanges.values():
+            if exchange.arbitrate:
+                _LOGGER.info("%s link win rate %s", exchange.label,
+                             " ".join("%.3f" % rate for rate in exchange.feed_win_rate()))
+        for probe in stages.probes():
+            for hist in probe.histograms():
+                if hist.count:
+                    _LOGGER.info("stage %s", hist)
+
+
+def execute_strategies(strategies):
+    """并发分析决策模型"""
+    for dec in strategies:
+        if dec.state == dec.PENDING:
+            continue
+        asyncio.ensure_future(dec.execute())
+
+
+async def schedule_strategies(strategies, scheduler, poll_interval):
+    """Run strategies with the configured scheduler
+
+    `poll` executes every strategy each `poll_interval`, `event` runs a
+    strategy as soon as its market data callback calls `notify`.
+    """
+    if scheduler == SCHEDULE_EVENT:
+        await run_strategies(strategies)
+        return
+
+    while True:
+        execute_strategies(strategies)
+        await asyncio.sleep(poll_interval)
+
+
 class TradeController(Singleton):
 
     def __init__(self):
         self.strategies = []
+        self.scheduler = SCHEDULE_POLL
+        self.poll_interval = 0.1
+        self.report_interval = 60
+        self.hub = None
+        self.workers = []
+        self.stats = None
+        self.log_config = None
 
     async def setup(self):
         config = {}
         with open("config.json", 'r') as f:
             config = json.loads(f.read())
 
-        for detail in config["strategy"]:
-            name = detail['name']
+        self.log_config = config.get("logging")
+        logs.setup(self.log_config)
+
+        self.scheduler = config.get("scheduler", SCHEDULE_POLL)
+        self.poll_interval = config.get("poll_interval", self.poll_interval)
+        self.report_interval = config.get("report_interval", self.report_interval)
+        recorder = dict(config.get("recorder") or {})
+        if recorder.pop("enabled", False):
+            ExchangeRegistry().recorder = recorder
 
-            if name == SPOT_CONTRACT:
-                from strategy.spot_contract import SpotContract
-                sc = SpotContract()
-                await sc.setup(detail['exchange'])
-                await sc.init()
-                self.strategies.append(sc)
+        stats = config.get("stats")
+        if stats:
+            # probes are created with exchanges and strategies, enable first
+            from monitor.server import StatsServer
+            stages.enable()
+            self.stats = StatsServer(stats.get("host", "127.0.0.1"),
+                                     stats.get("port", 9108))
+            REGISTRY.on_collect(self.collect_states)
+            await self.stats.start()
+
+        if config.get("workers", 0) > 0:
+            await self.setup_workers(config)
+            return
+
+        for detail in config["strategy"]:
+            dec = await load_strategy(detail)
+            if dec is not None:
+                self.strategies.append(dec)
 
         _LOGGER.debug("strategies load suc")
 
+    async def setup_workers(self, config):
+        """多进程部署
+
+        Exchanges connect in this process and publish into shared memory,
+        strategies are spread over `workers` processes.
+        """
+        from .worker import MarketDataHub, worker_main
+
+        ring = config.get("ring", {})
+        slots = ring.get("slots", 8192)
+        slot_size = ring.get("slot_size", 4096)
+
+        self.hub = MarketDataHub(slots, slot_size)
+        await self.hub.setup(config["strategy"])
+
+        count = config["workers"]
+        groups = [config["strategy"][i::count] for i in range(count)]
+        ctx = multiprocessing.get_context("spawn")
+        for worker_id, strategies in enumerate(groups):
+            if not strategies:
+                continue
+            reader, writer = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=worker_main, name="worker-%d" % worker_id,
+                               args=(worker_id, strategies, self.hub.ring.name,
+                                     slots, slot_size, self.hub.channels,
+                                     self.hub.ctrl, reader, self.log_config,
+                                     self.scheduler, self.poll_interval,
+                                     self.report_interval, self.stats is not None),
+                               daemon=True)
+            proc.start()
+            reader.close()
+            self.hub.add_worker(writer)
+            self.workers.append(proc)
+
+        _LOGGER.debug("%d strategy workers started", len(self.workers))
+
     async def release(self):
         await self.shut_strategies()
 
+        for proc in self.workers:
+            proc.terminate()
+            proc.join(5)
+        self.workers = []
+
+        if self.hub:
+            await self.hub.release()
+            self.hub = None
+
+        if self.stats:
+            await self.stats.stop()
+            self.stats = None
+
     async def shut_strategies(self):
         """关闭策略"""
         for dec in self.strategies:
@@ -44,7 +194,26 @@ class TradeController(Singleton):
 
     def execute(self):
         """并发分析决策模型"""
+        execute_strategies(self.strategies)
+
+    async def run(self):
+        """调度策略, see schedule_strategies"""
+        if self.hub:
+            await self.hub.run()
+            return
+
+        asyncio.ensure_future(self.report_latency())
+        await schedule_strategies(self.strategies, self.scheduler, self.poll_interval)
+
+    def collect_states(self):
+        """策略状态计数"""
+        STRATEGY_STATE.clear()
         for dec in self.strategies:
-            if dec.state == dec.PENDING:
-                continue
-            asyncio.ensure_future(dec.execute())
+            for state, name in dec.STATE_NAMES.items():
+                child = STRATEGY_STATE.labels(type(dec).__name__, name)
+                if dec.state == state:
+                    child.inc()
+
+    async def report_latency(self):
+        """定期输出 tick 到决策及各阶段的延迟分布"""
+        await report_latency(self.strategies, self.report_interval, self.scheduler)
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+
+from urllib.parse import urlparse
+
+from const import EXCHANGE_KUMEX
+from monitor import stages
+from utils import Singleton
+
+_LOGGER = logging.getLogger("registry")
+_LOGGER.setLevel(logging.DEBUG)
+
+
+class ExchangeRegistry(Singleton):
+    """Exchange connections shared by strategies
+
+    One exchange object, REST session and websocket per
+    (exchange, url, account). Strategies acquire and release it, the
+    connection is closed with its last user. Topic subscriptions are shared
+    through the exchange dispatch table, each strategy holding its own
+    SubscribeHandle.
+    """
+
+    def __init__(self):
+        self.exchanges = {}
+        self.refs = {}
+        self._locks = {}
+        # worker processes get market data from the hub, see tradecore.worker
+        self.feed = None
+        # journal options, frames of every connected exchange are recorded
+        self.recorder = None
+
+    @staticmethod
+    def key(config):
+        return config['name'], config['url'], config.get('key', '')
+
+    async def acquire(self, config):
+        """Get the shared exchange for an exchange config entry
+
+        Raises:
+            ValueError: unknown exchange
+        """
+        key = self.key(config)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            exchange = self.exchanges.get(key)
+            if exchange is None:
+                exchange = await self._create(key, config)
+                self.exchanges[key] = exchange
+                self.refs[key] = 0
+            self.refs[key] += 1
+        return exchange
+
+    async def release(self, exchange):
+        for key, obj in self.exchanges.items():
+            if obj is exchange:
+                break
+        else:
+            return
+
+        self.refs[key] -= 1
+        if self.refs[key] > 0:
+            return
+        del self.exchanges[key]
+        del self.refs[key]
+        await exchange.release()
+
+    async def _create(self, key, config):
+        name = config['name']
+        if name == EXCHANGE_KUMEX:
+            from kumex import KuMexExchange
+            from kumex.ratelimit import create_scheduler
+            exchange = KuMexExchange(config['url'],
+                                     config['key'],
+                                     config['secret'],
+                                     config['passphrase'],
+                                     private=config.get('private', True))
+            if config.get('rate_limit') is not False:
+                exchange.scheduler = create_scheduler(config.get('rate_limit'))
+        else:
+            raise ValueError("unknown exchange %s" % name)
+
+        # metric label and journal prefix, never derived from credentials
+        prefix = config.get('alias') or "%s-%s" % (name, urlparse(config['url']).hostname)
+        exchange.label = prefix
+        exchange.probe = stages.probe(prefix, stages.EXCHANGE_STAGES)
+        exchange.setup(config.get('connector'))
+        if config.get('clock_sync', 30):
+            exchange.sync_clock(config.get('clock_sync', 30))
+
+        if self.feed is not None:
+            exchange.feed = self.feed
+            self.feed.attach(key, exchange)
+            await exchange.refdata.prime()
+            return exchange
+
+        if self.recorder:
+            from journal import JournalRecorder
+            exchange.recorder = JournalRecorder(prefix=prefix, **self.recorder)
+            exchange.recorder.start()
+
+        try:
+            await exchange.ws_connect(*await exchange.get_ws_token(),
+                                      **config.get('websocket', {}))
+            await exchange.refdata.prime()
+        except Exception:
+            await exchange.release()
+            raise
+        _LOGGER.info("exchange %s %s connected", name, config['url'])
+        return exchange
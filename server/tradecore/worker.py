@@ -0,0 +1,250 @@
+"""多进程策略
+
+The main process owns the exchange websockets (`MarketDataHub`) and
+publishes the raw frame of every subscribed push into a shared memory ring.
+Strategies run in worker processes with the configured scheduler, their
+exchanges keep a REST session but no websocket: the `WorkerFeed` forwards
+subscriptions to the hub and dispatches ring messages through the regular
+`ExchangeAbstract._on_frame` path, so a frame is decoded once per worker.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+
+import logs
+from const import SCHEDULE_EVENT
+from monitor import stages
+
+from .registry import ExchangeRegistry
+from .shm import ShmRing
+
+_LOGGER = logging.getLogger("worker")
+_LOGGER.setLevel(logging.DEBUG)
+
+CTRL_SUB = "sub"
+CTRL_UNSUB = "unsub"
+
+
+class MarketDataHub:
+    """Exchange connections of the main process
+
+    Subscribes on behalf of the workers, each topic once whatever the number
+    of workers interested, and publishes its messages into the ring.
+    """
+
+    def __init__(self, slots=8192, slot_size=4096):
+        self.ring = ShmRing.create(slots, slot_size)
+        self.ctrl = multiprocessing.get_context("spawn").Queue()
+        self.configs = {}
+        self.channels = {}
+        self.exchanges = []
+        self.subs = {}
+        self._wakes = []
+        self._wake_pending = False
+
+    async def setup(self, strategies):
+        """Connect every exchange used by the strategies"""
+        registry = ExchangeRegistry()
+        for detail in strategies:
+            for config in detail['exchange']:
+                key = registry.key(config)
+                if key in self.channels:
+                    continue
+                self.configs[key] = config
+                channel = self.channels[key] = len(self.exchanges)
+                exchange = await registry.acquire(config)
+                exchange.tap = self._publisher(channel, key)
+                self.exchanges.append(exchange)
+
+    def _publisher(self, channel, key):
+        subs = self.subs
+
+        def _tap(topic, data):
+            # frames of topics no worker asked for stay in this process
+            if (key, topic) in subs:
+                self.publish(channel, topic, data)
+        return _tap
+
+    def add_worker(self, wake):
+        """Register the write end of a worker wake up pipe"""
+        os.set_blocking(wake.fileno(), False)
+        self._wakes.append(wake)
+
+    async def run(self):
+        """Serve worker subscription requests"""
+        loop = asyncio.get_event_loop()
+        while True:
+            try:
+                # bounded wait so the executor thread never outlives the loop
+                op, worker_id, key, topic = await loop.run_in_executor(
+                    None, self.ctrl.get, True, 1)
+            except queue.Empty:
+                continue
+            try:
+                if op == CTRL_SUB:
+                    await self._subscribe(worker_id, key, topic)
+                elif op == CTRL_UNSUB:
+                    self._unsubscribe(worker_id, key, topic)
+            except Exception as e:
+                _LOGGER.error("worker %s %s %s failed: %s", worker_id, op, topic, e)
+
+    async def _subscribe(self, worker_id, key, topic):
+        entry = self.subs.get((key, topic))
+        if entry is None:
+            # frames reach the ring through the exchange tap
+            handle = await self.exchanges[self.channels[key]].subscribe(topic, _ignore)
+            entry = self.subs[(key, topic)] = (handle, set())
+        entry[1].add(worker_id)
+
+    def _unsubscribe(self, worker_id, key, topic):
+        entry = self.subs.get((key, topic))
+        if entry is None:
+            return
+        entry[1].discard(worker_id)
+        if not entry[1]:
+            entry[0].unsubscribe()
+            del self.subs[(key, topic)]
+
+    def publish(self, channel, topic, data):
+        """Append a raw frame as received by the exchange"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if not self.ring.publish(channel, data):
+            _LOGGER.warning("message too large for ring slot: %s", topic)
+            return
+        if not self._wake_pending:
+            self._wake_pending = True
+            asyncio.get_event_loop().call_soon(self._wake)
+
+    def _wake(self):
+        """One wake up per loop iteration, however many messages"""
+        self._wake_pending = False
+        for wake in self._wakes:
+            try:
+                os.write(wake.fileno(), b'\0')
+            except BlockingIOError:
+                # pipe full, the worker has wake ups pending anyway
+                pass
+
+    async def release(self):
+        registry = ExchangeRegistry()
+        for exchange in self.exchanges:
+            await registry.release(exchange)
+        self.exchanges = []
+        for wake in self._wakes:
+            wake.close()
+        self._wakes = []
+        self.ring.close()
+
+
+def _ignore(msg_type, content):
+    pass
+
+
+class WorkerFeed:
+    """Market data source of a worker process"""
+
+    def __init__(self, worker_id, ring, ctrl, channels):
+        self.worker_id = worker_id
+        self.reader = ring.reader()
+        self.ctrl = ctrl
+        self.channels = channels
+        self.exchanges = {}
+        self.keys = {}
+        self.closed = None
+
+    def attach(self, key, exchange):
+        self.exchanges[self.channels[key]] = exchange
+        self.keys[id(exchange)] = key
+
+    async def subscribe(self, exchange, topic):
+        self.ctrl.put((CTRL_SUB, self.worker_id, self.keys[id(exchange)], topic))
+
+    async def unsubscribe(self, exchange, topic):
+        self.ctrl.put((CTRL_UNSUB, self.worker_id, self.keys[id(exchange)], topic))
+
+    def wake(self, fd):
+        try:
+            if not os.read(fd, 4096):
+                # hub process gone
+                asyncio.get_event_loop().remove_reader(fd)
+                if not self.closed.done():
+                    self.closed.set_result(None)
+                return
+        except BlockingIOError:
+            pass
+        if self.reader.lost:
+            _LOGGER.warning("worker %s lagging, %d messages lost",
+                            self.worker_id, self.reader.lost)
+            self.reader.lost = 0
+        exchanges = self.exchanges
+        for channel, payload in self.reader.read():
+            exchange = exchanges.get(channel)
+            if exchange is not None:
+                exchange._on_frame(payload.decode('utf-8'))
+
+
+def worker_main(worker_id, strategies, ring_name, slots, slot_size,
+                channels, ctrl, wake, log_config=None, scheduler=SCHEDULE_EVENT,
+                poll_interval=0.1, report_interval=60, stats=False):
+    """Worker process entry
+
+    Args:
+        worker_id:
+        strategies: strategy config entries run by this worker
+        ring_name, slots, slot_size: shared memory ring
+        channels: exchange key -> ring channel
+        ctrl: subscription request queue to the hub
+        wake: read end of the wake up pipe
+        log_config: see logs.setup
+        scheduler, poll_interval: see TradeController.run
+        report_interval: seconds between two latency reports
+        stats: record stage latencies, see monitor.stages
+    """
+    logs.setup(log_config)
+    if stats:
+        # before the exchanges and strategies create their probes
+        stages.enable()
+    try:
+        asyncio.run(_worker(worker_id, strategies, ring_name, slots, slot_size,
+                            channels, ctrl, wake.fileno(), scheduler, poll_interval,
+                            report_interval))
+    finally:
+        logs.shutdown()
+
+
+async def _worker(worker_id, strategies, ring_name, slots, slot_size,
+                  channels, ctrl, wake_fd, scheduler, poll_interval, report_interval):
+    from .control import load_strategy, report_latency, schedule_strategies
+
+    ring = ShmRing.attach(ring_name, slots, slot_size)
+    feed = WorkerFeed(worker_id, ring, ctrl, channels)
+    ExchangeRegistry().feed = feed
+
+    loop = asyncio.get_event_loop()
+    feed.closed = loop.create_future()
+    os.set_blocking(wake_fd, False)
+    loop.add_reader(wake_fd, feed.wake, wake_fd)
+
+    running = []
+    try:
+        for detail in strategies:
+            dec = await load_strategy(detail)
+            if dec is not None:
+                running.append(dec)
+        _LOGGER.info("worker %s runs %d strategies (%s)", worker_id, len(running), scheduler)
+        # until every strategy stopped or the hub went away
+        task = asyncio.ensure_future(schedule_strategies(running, scheduler, poll_interval))
+        report = asyncio.ensure_future(report_latency(
+            running, report_interval, "%s worker-%s" % (scheduler, worker_id)))
+        await asyncio.wait([task, feed.closed], return_when=asyncio.FIRST_COMPLETED)
+        task.cancel()
+        report.cancel()
+    finally:
+        loop.remove_reader(wake_fd)
+        for dec in running:
+            if dec.state != dec.CLOSE:
+                await dec.close()
+        ring.close()
@@ -1,3 +1,9 @@
+import asyncio
+import logging
+import time
+
+_LOGGER = logging.getLogger("utils")
+
 
 if "_SINGLE_OBJ" not in globals():
     _SINGLE_OBJ = {}
@@ -31,3 +37,81 @@ class Singleton(metaclass=SingletonMeta):
             _SINGLE_OBJ[cls.__name__] = obj
         return _SINGLE_OBJ[cls.__name__]
 
+
+class AsyncTTLCache:
+    """异步 TTL 缓存
+
+    Per-key TTL with single-flight loading: concurrent misses of a key share
+    one loader call. Once `refresh_ahead` of the TTL has elapsed, a read
+    returns the cached value and reloads it in the background, so hot keys
+    never expire under their readers.
+    """
+
+    def __init__(self, refresh_ahead=0.8):
+        self.refresh_ahead = refresh_ahead
+        self._entries = {}      # key -> (value, refresh_at, expire_at, ttl, loader)
+        self._inflight = {}
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() < entry[2]
+
+    def put(self, key, value, ttl, loader=None):
+        """Store a value, `loader` is used to refresh it"""
+        now = time.monotonic()
+        self._entries[key] = (value, now + ttl * self.refresh_ahead, now + ttl, ttl, loader)
+
+    def peek(self, key, default=None):
+        """Cached value without waiting, stale values are returned as well"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._maybe_refresh(key, entry)
+        return entry[0]
+
+    async def get(self, key, loader, ttl):
+        """Cached value, loaded by `loader()` coroutine on miss"""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[2]:
+            self._maybe_refresh(key, entry)
+            return entry[0]
+        return await self._load(key, loader, ttl)
+
+    async def load(self, key, loader, ttl):
+        """Reload now, sharing a load of the key already in flight"""
+        return await self._load(key, loader, ttl)
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+
+    def _maybe_refresh(self, key, entry):
+        loader = entry[4]
+        if loader is None or key in self._inflight or time.monotonic() < entry[1]:
+            return
+        asyncio.ensure_future(self._refresh(key, loader, entry[3]))
+
+    async def _refresh(self, key, loader, ttl):
+        try:
+            await self._load(key, loader, ttl)
+        except Exception as e:
+            _LOGGER.error("refresh %s failed: %s", key, e)
+
+    async def _load(self, key, loader, ttl):
+        waiter = self._inflight.get(key)
+        if waiter is not None:
+            return await asyncio.shield(waiter)
+
+        waiter = self._inflight[key] = asyncio.get_event_loop().create_future()
+        try:
+            value = await loader()
+        except Exception as e:
+            waiter.set_exception(e)
+            # mark retrieved when nobody else waits
+            waiter.exception()
+            raise
+        else:
+            self.put(key, value, ttl, loader)
+            waiter.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
@@ -0,0 +1,57 @@
+"""Websocket frame codec microbenchmark
+
+    python tests/bench_codec.py [frames]
+
+For every installed JSON backend, times a full decode against `peek` and
+the receive path of an exchange with the frame's topic subscribed or not.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server"))
+
+from driver import codec  # noqa: E402
+from kumex import KuMexExchange  # noqa: E402
+
+TOPIC = "/contractMarket/level2Depth5:XBTUSDM"
+
+
+def _frame(levels):
+    data = {"bids": [[9000.0 - i, 10 + i] for i in range(levels)],
+            "asks": [[9001.0 + i, 10 + i] for i in range(levels)],
+            "sequence": 1, "timestamp": 1551770400000}
+    return json.dumps({"type": "message", "topic": TOPIC, "subject": "level2",
+                       "data": data}, separators=(",", ":"))
+
+
+def _per_frame(fn, frame, count):
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        fn(frame)
+    return (time.perf_counter_ns() - start) / count
+
+
+def main(count):
+    subscribed = KuMexExchange("https://api-futures.kucoin.com", "k", "s", "p")
+    subscribed.publish_handler.add(TOPIC, lambda msg_type, content: None)
+    unsubscribed = KuMexExchange("https://api-futures.kucoin.com", "k", "s", "p")
+
+    print("%-7s %6s %10s %10s %12s %12s" % ("backend", "bytes", "loads ns", "peek ns",
+                                           "on_frame ns", "dropped ns"))
+    for name in codec.available():
+        codec.use(name)
+        for levels in (1, 5, 20):
+            frame = _frame(levels)
+            print("%-7s %6d %10.0f %10.0f %12.0f %12.0f" % (
+                name, len(frame),
+                _per_frame(codec.loads, frame, count),
+                _per_frame(codec.peek, frame, count),
+                _per_frame(subscribed._on_frame, frame, count),
+                _per_frame(unsubscribed._on_frame, frame, count)))
+    codec.use()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,61 @@
+"""Request signer microbenchmark
+
+    python tests/bench_signer.py [requests]
+
+Times RequestSigner.headers against keying a new HMAC and building the
+headers on every request, and the query string encoding.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server"))
+
+from kumex.signer import RequestSigner, encode_query  # noqa: E402
+
+KEY = "5f3cf2295b13f000064986a6"
+SECRET = "8436b3ec-892b-4f2f-ae65-4a4fa3768cac"
+PASSPHRASE = "1234567"
+URI = "/api/v1/orders?" + encode_query({"symbol": "XBTUSDM", "status": "active",
+                                        "pageSize": 50, "currentPage": 1})
+
+
+def naive_headers(now_time, method, uri_path):
+    str_to_sign = str(now_time) + method + uri_path
+    sign = base64.b64encode(hmac.new(SECRET.encode('utf-8'), str_to_sign.encode('utf-8'),
+                                     hashlib.sha256).digest())
+    return {
+        "KC-API-SIGN": sign.decode('utf-8'),
+        "KC-API-TIMESTAMP": str(now_time),
+        "KC-API-KEY": KEY,
+        "KC-API-PASSPHRASE": PASSPHRASE,
+        "Content-Type": "application/json"
+    }
+
+
+def _per_call(fn, count):
+    start = time.perf_counter_ns()
+    for i in range(count):
+        fn(1551770400000 + i)
+    return (time.perf_counter_ns() - start) / count
+
+
+def main(count):
+    signer = RequestSigner(KEY, SECRET, PASSPHRASE)
+    now = 1551770400000
+    assert signer.headers(now, "GET", URI) == naive_headers(now, "GET", URI)
+
+    naive = _per_call(lambda ts: naive_headers(ts, "GET", URI), count)
+    keyed = _per_call(lambda ts: signer.headers(ts, "GET", URI), count)
+    params = {"symbol": "XBTUSDM", "status": "active", "pageSize": 50, "currentPage": 1}
+    query = _per_call(lambda ts: encode_query(params), count)
+    print("naive headers  %7.0f ns" % naive)
+    print("signer headers %7.0f ns  (%.2fx)" % (keyed, naive / keyed))
+    print("encode_query   %7.0f ns" % query)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
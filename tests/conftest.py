@@ -0,0 +1,5 @@
+import os
+import sys
+
+# modules import each other from the server directory, as when run by start.sh
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server"))
@@ -0,0 +1,40 @@
+import json
+
+from driver import codec
+from kumex import KuMexExchange
+
+TOPIC = "/contractMarket/level2:XBTUSDM"
+
+
+def _frame(topic_last):
+    data = {"sequence": 1, "change": "5000.0,sell,83", "timestamp": 1551770400000,
+            "pad": "x" * 400}
+    if topic_last:
+        frame = {"type": "message", "subject": "level2", "data": data, "topic": TOPIC}
+    else:
+        frame = {"type": "message", "topic": TOPIC, "subject": "level2", "data": data}
+    return json.dumps(frame, separators=(",", ":"))
+
+
+def test_peek_topic_before_data():
+    assert codec.peek(_frame(False)) == ("message", TOPIC)
+
+
+def test_peek_topic_after_data_needs_decode():
+    assert codec.peek(_frame(True)) == (None, None)
+
+
+def test_subscribed_frame_delivered_whatever_key_order():
+    exchange = KuMexExchange("https://api-futures.kucoin.com", "k", "s", "p")
+    received = []
+    exchange.publish_handler.add(TOPIC, lambda msg_type, content: received.append(content))
+
+    for topic_last in (False, True):
+        exchange._on_frame(_frame(topic_last))
+
+    assert len(received) == 2
+
+
+def test_unsubscribed_frame_dropped_before_decode():
+    exchange = KuMexExchange("https://api-futures.kucoin.com", "k", "s", "p")
+    assert exchange._check_publish_data(_frame(False)) == ("message", None, None)
@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+from kumex import KuMexExchange
+from kumex.gateway import OrderGateway
+
+
+class AckSocket:
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.sent = []
+
+    async def send_json(self, msg):
+        self.sent.append(msg)
+        if msg['type'] == 'subscribe':
+            reply = '{"id":"%s","type":"ack"}' % msg['id']
+            asyncio.get_event_loop().call_soon(self.exchange._on_frame, reply)
+
+
+def test_order_push_resolves_before_rest():
+    async def run():
+        exchange = KuMexExchange("https://api-futures.kucoin.com", "k", "s", "p", private=True)
+        ws = AckSocket(exchange)
+        exchange._links.append(ws)
+        exchange.websocket = ws
+        rest = asyncio.get_event_loop().create_future()
+
+        async def create_limit_order(**params):
+            return await rest
+
+        exchange.create_limit_order = create_limit_order
+        gateway = OrderGateway(exchange)
+        handle = await gateway.start()
+        fut, = gateway.submit([{'symbol': 'XBTUSDM', 'side': 'buy', 'lever': 1,
+                                'size': 1, 'price': 1, 'clientOid': 'c1'}])
+        await asyncio.sleep(0)
+        exchange._on_frame(json.dumps({
+            "type": "message", "topic": "/contractMarket/tradeOrders", "subject": "orderChange",
+            "data": {"clientOid": "c1", "orderId": "o1", "status": "open"}}))
+        ack = await asyncio.wait_for(fut, 1)
+        rest.set_result({'orderId': 'o1'})
+        await asyncio.sleep(0)
+        handle.unsubscribe()
+        return ws, ack
+
+    ws, ack = asyncio.run(run())
+    sub = ws.sent[0]
+    assert sub['topic'] == "/contractMarket/tradeOrders"
+    assert sub['privateChannel'] is True
+    assert ack['orderId'] == 'o1'
+
+
+def test_public_topic_not_flagged_private():
+    async def run():
+        exchange = KuMexExchange("https://api-futures.kucoin.com", "k", "s", "p", private=True)
+        ws = AckSocket(exchange)
+        exchange._links.append(ws)
+        exchange.websocket = ws
+        await exchange.sub_instrument('XBTUSDM', lambda *args: None)
+        return ws
+
+    assert asyncio.run(run()).sent[0]['privateChannel'] is False
@@ -0,0 +1,85 @@
+import asyncio
+
+from history import HistoryService
+from kumex.request.market import MarketRequest
+
+MINUTE = 60000
+
+
+class PagedMarket(MarketRequest):
+    """Interest rate endpoint paging like the exchange: newest first unless reverse=false"""
+
+    def __init__(self, points):
+        self.points = points
+        self.requests = []
+
+    async def _request(self, method, uri, timeout=30, auth=True, params=None):
+        self.requests.append(dict(params))
+        items = [p for p in self.points if params['startAt'] <= p <= params['endAt']]
+        if params.get('reverse', True) is not False:
+            items.reverse()
+        count = params['maxCount']
+        return {
+            'dataList': [{'symbol': params['symbol'], 'granularity': MINUTE,
+                          'timePoint': p, 'value': 0.0003} for p in items[:count]],
+            'hasMore': len(items) > count,
+        }
+
+
+def test_interest_pages_cover_window(tmp_path):
+    start = 1570000000000
+    end = start + 6 * 3600000
+    exchange = PagedMarket(list(range(start, end, MINUTE)))
+    service = HistoryService(exchange, root=str(tmp_path), rate=1000)
+
+    columns = asyncio.run(service.load("interest", ".XBTINT", start, end))
+
+    assert list(columns["timePoint"]) == [float(p) for p in range(start, end, MINUTE)]
+    assert all(request['reverse'] is False for request in exchange.requests)
+    assert len(exchange.requests) == 4
+
+
+def test_interest_cached_after_load(tmp_path):
+    start = 1570000000000
+    end = start + 3600000
+    exchange = PagedMarket(list(range(start, end, MINUTE)))
+    asyncio.run(HistoryService(exchange, root=str(tmp_path), rate=1000)
+                .load("interest", ".XBTINT", start, end))
+    exchange.requests = []
+
+    columns = asyncio.run(HistoryService(exchange, root=str(tmp_path), rate=1000)
+                          .load("interest", ".XBTINT", start, end))
+
+    assert len(columns["timePoint"]) == 60
+    assert exchange.requests == []
+
+
+class FillsExchange:
+    """Two pages repeating a fill, plus two identical fills of distinct trades"""
+
+    def __init__(self, start):
+        fill = {"symbol": "XBTUSDM", "price": "4000.0", "size": 1, "value": "0.00025",
+                "fee": "0.0000001", "createdAt": start + 1000}
+        self.pages = [
+            [dict(fill, tradeId="5ce24c1f0c19fc3c58edc47c", side="sell"),
+             dict(fill, tradeId="5ce24c1f0c19fc3c58edc47d", side="sell")],
+            [dict(fill, tradeId="5ce24c1f0c19fc3c58edc47d", side="sell"),
+             dict(fill, tradeId="5ce24c1f0c19fc3c58edc47e", side="buy", createdAt=start + 2000)],
+        ]
+
+    async def get_fills_details(self, symbol, startAt, endAt, currentPage, pageSize):
+        return {"currentPage": currentPage, "totalPage": len(self.pages),
+                "items": self.pages[currentPage - 1]}
+
+
+def test_fills_unique_by_trade_id(tmp_path):
+    start = 1570000000000
+    exchange = FillsExchange(start)
+    service = HistoryService(exchange, root=str(tmp_path), rate=1000)
+
+    columns = asyncio.run(service.load("fills", "XBTUSDM", start, start + 3600000))
+
+    assert list(columns["side"]) == [-1.0, -1.0, 1.0]
+    trades = {(int(hi) << 48) | int(lo) for hi, lo in zip(columns["trade_hi"], columns["trade_lo"])}
+    assert trades == {0x5ce24c1f0c19fc3c58edc47c, 0x5ce24c1f0c19fc3c58edc47d,
+                      0x5ce24c1f0c19fc3c58edc47e}
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import time
+
+from journal.recorder import JournalRecorder
+
+
+def test_close_does_not_block_loop(tmp_path):
+    async def run():
+        recorder = JournalRecorder(str(tmp_path), "rec", codec="none", flush_interval=0.2)
+        flush = recorder._flush
+
+        def slow_flush():
+            # a writer stuck on disk while the loop closes the recorder
+            time.sleep(0.1)
+            flush()
+
+        recorder._flush = slow_flush
+        recorder.start()
+        recorder.append('{"type":"message"}')
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        await recorder.close()
+        ticker.cancel()
+        return recorder, ticks
+
+    recorder, ticks = asyncio.run(run())
+    assert len(ticks) > 1
+    assert recorder.written > 0
+    assert recorder._thread is None
+
+
+def test_dropped_only_counted_by_append(tmp_path):
+    recorder = JournalRecorder(str(tmp_path), "rec", codec="none", max_pending=2)
+    for _ in range(5):
+        recorder.append("x")
+    assert recorder.dropped == 3
+    recorder._flush()
+    recorder._close_segment()
+    assert recorder.dropped == 3
+
+
+def test_retention_prunes_oldest(tmp_path):
+    now = time.time_ns()
+    for i in range(4):
+        open(os.path.join(str(tmp_path), "rec-%d.hbj.raw" % (now - (4 - i) * 10 ** 9)), 'wb').close()
+    old = "rec-%d.hbj.raw" % (now - 10 ** 12)
+    open(os.path.join(str(tmp_path), old), 'wb').close()
+    other = "keep-%d.hbj.raw" % (now - 10 ** 12)
+    open(os.path.join(str(tmp_path), other), 'wb').close()
+
+    recorder = JournalRecorder(str(tmp_path), "rec", codec="none", max_segments=3, max_age=100)
+    recorder._open_segment()
+    recorder._close_segment()
+
+    names = sorted(os.listdir(str(tmp_path)))
+    assert other in names
+    assert old not in names
+    assert len([n for n in names if n.startswith("rec-")]) == 3
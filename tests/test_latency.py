@@ -0,0 +1,106 @@
+import asyncio
+import functools
+import shutil
+import ssl
+import subprocess
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from driver import exchange as driver_exchange
+from driver.exchange import ExchangeAbstract
+
+PORT = 19322
+URL = "https://127.0.0.1:%d" % PORT
+WARM = 4
+
+
+class LocalRest(ExchangeAbstract):
+    warm_path = '/api/v1/timestamp'
+
+
+@pytest.fixture
+def tls(tmp_path):
+    """Self-signed certificate of 127.0.0.1
+
+    Returns:
+        (server context, client context trusting it)
+    """
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl not installed")
+    cert, key = str(tmp_path / "cert.pem"), str(tmp_path / "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+                    "-keyout", key, "-out", cert],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    server = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server.load_cert_chain(cert, key)
+    return server, ssl.create_default_context(cafile=cert)
+
+
+async def _serve(context):
+    peers = set()
+
+    async def timestamp(request):
+        # one client port per TLS connection
+        peers.add(request.transport.get_extra_info('peername')[1])
+        return web.json_response({"code": "200000", "data": int(time.time() * 1000)})
+
+    app = web.Application()
+    app.router.add_get('/api/v1/timestamp', timestamp)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', PORT, ssl_context=context).start()
+    return runner, peers
+
+
+async def _burst(session, count):
+    """Mean latency in ms of `count` concurrent requests"""
+    async def _get():
+        start = time.perf_counter()
+        async with session.get(URL + LocalRest.warm_path) as r:
+            await r.read()
+        return time.perf_counter() - start
+
+    results = await asyncio.gather(*[_get() for _ in range(count)])
+    return sum(results) / count * 1000
+
+
+def test_warm_pool_skips_handshakes(tls, monkeypatch):
+    server_context, client_context = tls
+    monkeypatch.setattr(driver_exchange.aiohttp, "TCPConnector",
+                        functools.partial(aiohttp.TCPConnector, ssl=client_context))
+
+    async def run():
+        runner, peers = await _serve(server_context)
+        exchange = LocalRest(URL)
+        exchange.setup({"warm": WARM, "warm_interval": 30})
+        try:
+            for _ in range(100):
+                if len(peers) >= WARM:
+                    break
+                await asyncio.sleep(0.01)
+            warmed = len(peers)
+            # let the warm up requests hand their connections back
+            await asyncio.sleep(0.05)
+
+            warm = min([await _burst(exchange.request, WARM) for _ in range(5)])
+            reused = len(peers) == warmed
+
+            cold = []
+            for _ in range(5):
+                async with aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(ssl=client_context)) as session:
+                    cold.append(await _burst(session, WARM))
+            return warmed, reused, warm, min(cold)
+        finally:
+            await exchange.release()
+            await runner.cleanup()
+
+    warmed, reused, warm, cold = asyncio.run(run())
+    print("warm %.2fms cold %.2fms" % (warm, cold))
+    assert warmed == WARM
+    assert reused
+    assert warm < cold
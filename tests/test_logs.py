@@ -0,0 +1,67 @@
+import json
+import logging
+
+import logs
+
+
+def test_level_applies_to_loggers_pinned_at_debug(tmp_path):
+    path = tmp_path / "out.log"
+    logger = logging.getLogger("test.pinned")
+    logger.setLevel(logging.DEBUG)
+
+    listener = logs.setup({"level": "INFO", "format": "json", "file": str(path)})
+    try:
+        enqueue = logging.getLogger().handlers[0]
+        logger.debug("dropped %s", {"big": "dict"})
+        assert enqueue.queue.empty()
+        logger.info("kept")
+    finally:
+        logs.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["msg"] for line in lines] == ["kept"]
+    assert listener.handlers[0].level == logging.INFO
+
+
+def test_sampling_keeps_one_of_n(tmp_path):
+    path = tmp_path / "out.log"
+    logger = logging.getLogger("test.sampled")
+    logger.setLevel(logging.DEBUG)
+
+    logs.setup({"format": "json", "file": str(path), "sample": {"test.sampled": 3}})
+    try:
+        for i in range(7):
+            logger.debug("tick %d", i)
+        logger.warning("always")
+    finally:
+        logs.shutdown()
+        logger.filters.clear()
+
+    msgs = [json.loads(line)["msg"] for line in path.read_text().splitlines()]
+    assert msgs == ["tick 0", "tick 3", "tick 6", "always"]
+
+
+def test_arguments_snapshot_at_call(tmp_path):
+    path = tmp_path / "out.log"
+    logger = logging.getLogger("test.mutated")
+    logs.setup({"format": "json", "file": str(path)})
+    try:
+        book = {"bid": 1}
+        logger.info("book %s", book)
+        book["bid"] = 2
+    finally:
+        logs.shutdown()
+
+    assert json.loads(path.read_text())["msg"] == "book {'bid': 1}"
+
+
+def test_setup_twice_keeps_one_sampler(tmp_path):
+    logger = logging.getLogger("test.resampled")
+    config = {"format": "json", "file": str(tmp_path / "out.log"), "sample": {"test.resampled": 3}}
+    logs.setup(config)
+    logs.setup(config)
+    try:
+        assert len(logger.filters) == 1
+    finally:
+        logs.shutdown()
+    assert not logger.filters
@@ -0,0 +1,55 @@
+import json
+
+from driver import codec
+from kumex import KuMexExchange
+from monitor.metrics import WS_FEED_DROPS, WS_FEED_WINS
+
+TOPIC = "/contractMarket/level2:XBTUSDM"
+
+
+def _frame(seq):
+    return json.dumps({"type": "message", "topic": TOPIC, "subject": "level2",
+                       "data": {"sequence": seq, "change": "5000.0,sell,83"}},
+                      separators=(",", ":"))
+
+
+def _racing():
+    exchange = KuMexExchange("https://api-futures.kucoin.com", "k", "s", "p")
+    exchange.label = "race"
+    exchange.arbitrate = True
+    exchange.feed_wins = [WS_FEED_WINS.labels("race", slot) for slot in range(2)]
+    exchange.feed_drops = [WS_FEED_DROPS.labels("race", slot) for slot in range(2)]
+    received = []
+    exchange.publish_handler.add(TOPIC, lambda msg_type, content: received.append(
+        content["data"]["sequence"]))
+    decoded = []
+    check = exchange._check_publish_data
+
+    def _counting(data):
+        decoded.append(data)
+        return check(data)
+
+    exchange._check_publish_data = _counting
+    return exchange, received, decoded
+
+
+def test_peek_int():
+    frame = _frame(42)
+    assert codec.peek_int(frame, "sequence", frame.find('"data"')) == 42
+    assert codec.peek_int('{"data":{"sequence": 7}}', "sequence") == 7
+    assert codec.peek_int('{"data":{"sequence":"7"}}', "sequence") is None
+
+
+def test_copies_dropped_before_decode():
+    exchange, received, decoded = _racing()
+    exchange._on_race_frame(_frame(1), 0, None)
+    exchange._on_race_frame(_frame(1), 1, None)
+    exchange._on_race_frame(_frame(2), 1, None)
+    exchange._on_race_frame(_frame(2), 0, None)
+    # late and older than the last delivered
+    exchange._on_race_frame(_frame(1), 0, None)
+
+    assert received == [1, 2]
+    assert len(decoded) == 2
+    assert [child.value for child in exchange.feed_wins] == [1, 1]
+    assert [child.value for child in exchange.feed_drops] == [2, 1]
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+from driver.ratelimit import RequestScheduler
+from kumex import KuMexExchange
+from kumex.ratelimit import create_scheduler
+
+PORT = 19323
+
+
+def test_order_not_held_by_blocked_read():
+    async def run():
+        scheduler = RequestScheduler({"order": (5, 5), "private": (2, 3)}, total=(60, 20))
+        loop = asyncio.get_event_loop()
+        await scheduler.acquire("private", 10)
+        await scheduler.acquire("private", 10)
+        read = asyncio.ensure_future(scheduler.acquire("private", 10))
+        # read queued and its refill timer armed
+        await asyncio.sleep(0.01)
+
+        start = loop.time()
+        await scheduler.acquire("order", 0)
+        waited = loop.time() - start
+        assert not read.done()
+        await read
+        return waited
+
+    assert asyncio.run(run()) < 0.05
+
+
+def test_order_first_when_shared_budget_short():
+    async def run():
+        scheduler = RequestScheduler({"order": (10, 10), "public": (10, 10)}, total=(1, 10))
+        await scheduler.acquire("public", 20)
+        done = []
+
+        async def call(name, priority):
+            await scheduler.acquire(name, priority)
+            done.append(name)
+
+        tasks = [asyncio.ensure_future(call("public", 20)) for _ in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(call("order", 0)))
+        await asyncio.gather(*tasks)
+        return done
+
+    assert asyncio.run(run())[0] == "order"
+
+
+def test_blocked_class_waiters_left_queued():
+    async def run():
+        scheduler = RequestScheduler({"order": (5, 5), "private": (1, 1)})
+        await scheduler.acquire("private", 10)
+        reads = [asyncio.ensure_future(scheduler.acquire("private", 10)) for _ in range(1000)]
+        await asyncio.sleep(0)
+        queued = list(scheduler._waiters["private"])
+        await scheduler.acquire("order", 0)
+        untouched = scheduler._waiters["private"] == queued
+        for read in reads:
+            read.cancel()
+        return untouched
+
+    assert asyncio.run(run())
+
+
+def test_backoff_after_429():
+    async def run():
+        hits = []
+
+        async def timestamp(request):
+            hits.append(time.monotonic())
+            if len(hits) == 1:
+                return web.Response(status=429, text="Too Many Requests")
+            return web.json_response({"code": "200000", "data": int(time.time() * 1000)})
+
+        app = web.Application()
+        app.router.add_get('/api/v1/timestamp', timestamp)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', PORT).start()
+
+        exchange = KuMexExchange("http://127.0.0.1:%d" % PORT, "k", "s", "p")
+        exchange.setup()
+        exchange.scheduler = create_scheduler()
+        try:
+            try:
+                await exchange.get_server_timestamp()
+            except Exception as e:
+                error = e
+            await exchange.get_server_timestamp()
+        finally:
+            await exchange.release()
+            await runner.cleanup()
+        return error, hits, exchange.scheduler.rejected
+
+    error, hits, rejected = asyncio.run(run())
+    assert str(error).startswith("429")
+    assert rejected == 1
+    # the budget is drained for a second instead of retrying at once
+    assert hits[1] - hits[0] >= 0.9
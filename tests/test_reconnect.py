@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from driver.exchange import ExchangeAbstract
+
+PORT = 19321
+URL = "http://127.0.0.1:%d/ws" % PORT
+
+
+class LocalExchange(ExchangeAbstract):
+
+    async def _ws_endpoint(self, slot):
+        return URL, False, 5
+
+    def _check_publish_data(self, data):
+        content = json.loads(data)
+        return content['type'], content.get('topic'), content
+
+    async def _keepalive(self, ws):
+        pass
+
+    async def _sub_request(self, topics, ws):
+        pass
+
+    async def _unsub_request(self, topics, ws):
+        pass
+
+
+async def _serve():
+    sockets = []
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        sockets.append(ws)
+        async for _ in ws:
+            pass
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/ws', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', PORT).start()
+    return runner, sockets
+
+
+async def _stop(server):
+    runner, sockets = server
+    for ws in sockets:
+        await ws.close()
+    await runner.cleanup()
+
+
+def test_first_connect_gives_up():
+    async def run():
+        exchange = LocalExchange(URL)
+        exchange.setup()
+        try:
+            with pytest.raises(ConnectionError):
+                await exchange.ws_connect(URL, False, 5, max_reconnect=1,
+                                          retry_interval=0.01, retry_max=0.02)
+        finally:
+            await exchange.release()
+
+    asyncio.run(run())
+
+
+def test_link_keeps_retrying_after_max_reconnect():
+    async def run():
+        server = await _serve()
+        exchange = LocalExchange(URL)
+        exchange.setup()
+        try:
+            await exchange.ws_connect(URL, False, 5, max_reconnect=1,
+                                      retry_interval=0.01, retry_max=0.02)
+            assert exchange.websocket is not None
+
+            await _stop(server)
+            await asyncio.sleep(0.3)
+            assert exchange.websocket is None
+
+            server = await _serve()
+            for _ in range(50):
+                if exchange.websocket is not None:
+                    break
+                await asyncio.sleep(0.02)
+            assert exchange.websocket is not None
+        finally:
+            await exchange.release()
+            await _stop(server)
+
+    asyncio.run(run())
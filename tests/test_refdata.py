@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from kumex.refdata import ReferenceData
+
+
+class FakeExchange:
+
+    def __init__(self, symbols, skew_ms=0):
+        self.symbols = symbols
+        self.skew_ms = skew_ms
+        self.time_sync = None
+        self.bulk = 0
+        self.single = 0
+
+    def clock(self):
+        # already exchange time, as with a synced clock
+        return time.time() + self.skew_ms / 1000
+
+    async def get_contracts_list(self):
+        self.bulk += 1
+        return [{'symbol': s, 'tickSize': 1, 'makerFeeRate': 0, 'takerFeeRate': 0}
+                for s in self.symbols]
+
+    async def get_contract_detail(self, symbol):
+        self.single += 1
+        return {'symbol': symbol}
+
+    async def get_server_timestamp(self):
+        return self.clock() * 1000
+
+
+def test_contracts_refreshed_without_readers():
+    async def run():
+        exchange = FakeExchange(['A', 'B'])
+        refdata = ReferenceData(exchange, ttl=0.05)
+        await refdata.prime()
+        await asyncio.sleep(0.13)
+        refdata.stop()
+        return exchange
+
+    exchange = asyncio.run(run())
+    assert exchange.bulk >= 3
+
+
+def test_symbol_refresh_uses_bulk_request():
+    async def run():
+        exchange = FakeExchange(['A', 'B', 'C'])
+        refdata = ReferenceData(exchange, ttl=0.05)
+        await refdata.prime()
+        refdata.stop()
+        await asyncio.sleep(0.06)
+        details = await asyncio.gather(*[refdata.contract(s) for s in 'ABC'])
+        other = await refdata.contract('Z')
+        return exchange, details, other
+
+    exchange, details, other = asyncio.run(run())
+    assert [d['symbol'] for d in details] == ['A', 'B', 'C']
+    assert other == {'symbol': 'Z'}
+    assert exchange.bulk == 3
+    assert exchange.single == 1
+
+
+def test_offset_measured_against_local_clock():
+    exchange = FakeExchange([], skew_ms=5000)
+    offset = asyncio.run(ReferenceData(exchange).server_time_offset())
+    assert abs(offset - 5000) < 50
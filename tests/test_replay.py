@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from journal.replay import ReplayExchange
+from journal.segment import RECORD, open_writer, stream_segment
+
+
+def write_segment(path, codec, records):
+    with open_writer(path, codec) as f:
+        for ts, frame in records:
+            frame = frame.encode('utf-8')
+            f.write(RECORD.pack(ts, len(frame)) + frame)
+
+
+def rest(method, uri, params):
+    return {}
+
+
+def test_merges_segments_by_receive_time(tmp_path):
+    # file names sort opposite to the recorded time
+    write_segment(os.path.join(str(tmp_path), "b-1.hbj.gz"), "gzip",
+                  [(10, "b10"), (30, "b30"), (50, "b50")])
+    write_segment(os.path.join(str(tmp_path), "a-9.hbj.raw"), "none",
+                  [(20, "a20"), (40, "a40")])
+    write_segment(os.path.join(str(tmp_path), "c-5.hbj.gz"), "gzip", [])
+
+    exchange = ReplayExchange.from_dir(str(tmp_path), rest=rest)
+    assert [frame for _, frame in exchange.records()] == ["b10", "a20", "b30", "a40", "b50"]
+
+
+def test_stream_segment_crosses_chunks(tmp_path):
+    path = os.path.join(str(tmp_path), "s-1.hbj.gz")
+    records = [(i, "frame-%d" % i * (i % 7 + 1)) for i in range(500)]
+    write_segment(path, "gzip", records)
+    assert list(stream_segment(path, chunk_size=37)) == records
+
+
+def test_rest_required():
+    with pytest.raises(ValueError):
+        ReplayExchange([])
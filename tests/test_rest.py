@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+
+from kumex import KuMexExchange
+from monitor.metrics import REST_ERRORS
+
+
+def test_error_before_response_counted():
+    async def run():
+        # nothing listens there
+        exchange = KuMexExchange("http://127.0.0.1:9", "k", "s", "p")
+        exchange.label = "unreachable"
+        exchange.setup()
+        try:
+            with pytest.raises(Exception) as error:
+                await exchange.get_server_timestamp()
+        finally:
+            await exchange.release()
+        return type(error.value).__name__
+
+    name = asyncio.run(run())
+    assert REST_ERRORS.labels("unreachable", name).value == 1
@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import pytest
+
+from kumex import KuMexExchange
+
+TOPIC = "/contractMarket/level2:XBTUSDM"
+
+
+def _frame(seq):
+    return json.dumps({"type": "message", "topic": TOPIC, "subject": "level2",
+                       "data": {"sequence": seq, "change": "5000.0,sell,83"}},
+                      separators=(",", ":"))
+
+
+def _standby_pair():
+    exchange = KuMexExchange("https://api-futures.kucoin.com", "k", "s", "p")
+    exchange._track_seq = True
+    active, standby = object(), object()
+    exchange._links.extend([active, standby])
+    exchange.websocket = active
+    received = []
+    exchange.publish_handler.add(TOPIC, lambda msg_type, content: received.append(
+        content["data"]["sequence"]))
+    return exchange, active, standby, received
+
+
+def test_promoted_standby_fills_gap():
+    exchange, active, standby, received = _standby_pair()
+    for seq in (1, 2):
+        exchange._on_frame(_frame(seq))
+    for seq in (1, 2, 3, 4):
+        exchange._buffer_standby(standby, _frame(seq))
+
+    # active link lost after delivering 2
+    exchange._links.remove(active)
+    exchange._promote(standby)
+    exchange._on_frame(_frame(5))
+
+    assert exchange.websocket is standby
+    assert received == [1, 2, 3, 4, 5]
+    assert standby not in exchange._standby_frames
+
+
+class QuietSocket:
+    """Records requests, acks only when told to"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, msg):
+        self.sent.append(msg)
+
+
+def _ack(msg):
+    return '{"id":"%s","type":"ack"}' % msg['id']
+
+
+def _subscribing():
+    exchange = KuMexExchange("https://api-futures.kucoin.com", "k", "s", "p")
+    exchange._track_seq = True
+    active, standby = QuietSocket(), QuietSocket()
+    exchange._links.extend([active, standby])
+    exchange.websocket = active
+    return exchange, active, standby
+
+
+def test_pending_standby_ack_resolves_after_promotion():
+    async def run():
+        exchange, active, standby = _subscribing()
+        sub = asyncio.ensure_future(exchange.subscribe(TOPIC, lambda *args: None))
+        await asyncio.sleep(0.01)
+        exchange._drop_link(active)
+        await asyncio.sleep(0)
+        assert not sub.done()
+        exchange._on_frame(_ack(standby.sent[0]))
+        await asyncio.wait_for(sub, 1)
+        return standby
+
+    standby = asyncio.run(run())
+    assert len(standby.sent) == 1
+
+
+def test_standby_acked_before_promotion_is_asked_again():
+    async def run():
+        exchange, active, standby = _subscribing()
+        sub = asyncio.ensure_future(exchange.subscribe(TOPIC, lambda *args: None))
+        await asyncio.sleep(0.01)
+        exchange._on_standby_frame(standby, _ack(standby.sent[0]))
+        exchange._drop_link(active)
+        await asyncio.sleep(0.01)
+        assert not sub.done()
+        exchange._on_frame(_ack(standby.sent[1]))
+        await asyncio.wait_for(sub, 1)
+        return standby
+
+    standby = asyncio.run(run())
+    assert [msg['topic'] for msg in standby.sent] == [TOPIC, TOPIC]
+
+
+def test_subscribe_fails_without_link_left():
+    async def run():
+        exchange, active, standby = _subscribing()
+        exchange._drop_link(standby)
+        sub = asyncio.ensure_future(exchange.subscribe(TOPIC, lambda *args: None))
+        await asyncio.sleep(0.01)
+        exchange._drop_link(active)
+        with pytest.raises(ConnectionResetError):
+            await asyncio.wait_for(sub, 1)
+
+    asyncio.run(run())
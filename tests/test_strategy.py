@@ -0,0 +1,39 @@
+import asyncio
+
+from strategy.base import StrategyBase
+from tradecore.control import run_strategies
+
+
+class Failing(StrategyBase):
+
+    async def analysis(self):
+        raise ValueError("order rejected")
+
+
+class Counting(StrategyBase):
+
+    def __init__(self):
+        super(Counting, self).__init__()
+        self.runs = 0
+
+    async def analysis(self):
+        self.runs += 1
+
+
+def test_failing_strategy_does_not_stop_others():
+    async def run():
+        failing, counting = Failing(), Counting()
+        runner = asyncio.ensure_future(run_strategies([failing, counting]))
+        for _ in range(3):
+            failing.notify()
+            counting.notify()
+            await asyncio.sleep(0.01)
+
+        assert not runner.done()
+        assert failing.state == failing.PENDING
+        assert counting.runs == 3
+
+        await counting.close()
+        await asyncio.wait_for(runner, 1)
+
+    asyncio.run(run())
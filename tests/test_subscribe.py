@@ -0,0 +1,59 @@
+import asyncio
+
+from kumex import KuMexExchange
+
+
+class FakeSocket:
+    """Acks subscribe requests unless their topic is rejected"""
+
+    def __init__(self, exchange, rejected):
+        self.exchange = exchange
+        self.rejected = rejected
+        self.sent = []
+
+    async def send_json(self, msg):
+        self.sent.append(msg)
+        if msg['type'] != 'subscribe':
+            return
+        if msg['topic'].partition(':')[0] in self.rejected:
+            reply = '{"id":"%s","type":"error","code":404,"data":"topic not found"}' % msg['id']
+        else:
+            reply = '{"id":"%s","type":"ack"}' % msg['id']
+        asyncio.get_event_loop().call_soon(self.exchange._on_frame, reply)
+
+
+def _connected(rejected=()):
+    exchange = KuMexExchange("https://api-futures.kucoin.com", "k", "s", "p")
+    ws = FakeSocket(exchange, rejected)
+    exchange._links.append(ws)
+    exchange.websocket = ws
+    return exchange, ws
+
+
+def test_subscribe_many_merges_symbols():
+    async def run():
+        exchange, ws = _connected()
+        topics = ["/contractMarket/ticker:S%d" % i for i in range(150)]
+        handles = await exchange.subscribe_many(topics, lambda *args: None)
+        return exchange, ws, handles
+
+    exchange, ws, handles = asyncio.run(run())
+    assert len(handles) == 150
+    assert [len(msg['topic'].split(',')) for msg in ws.sent] == [100, 50]
+    assert len({msg['id'] for msg in ws.sent}) == 2
+
+
+def test_subscribe_many_rolls_back_on_error():
+    async def run():
+        exchange, ws = _connected(rejected=("/contract/instrument",))
+        try:
+            await exchange.sub_universe(['A', 'B'], lambda *args: None)
+        except Exception as e:
+            error = e
+        await asyncio.sleep(0)
+        return exchange, ws, error
+
+    exchange, ws, error = asyncio.run(run())
+    assert "404" in str(error)
+    assert len(exchange.publish_handler) == 0
+    assert [msg['type'] for msg in ws.sent].count('unsubscribe') == 2
@@ -0,0 +1,55 @@
+import asyncio
+
+import numpy as np
+
+from market import TickRing, TickStore
+from market.ticks import MATCH, TICKER
+
+
+def test_ring_wraps_and_windows_stay_contiguous():
+    ring = TickRing(4, ("ts", "price"))
+    for i in range(11):
+        ring.append(i, i * 10.0)
+
+    assert len(ring) == 4
+    assert list(ring.window("price")) == [70.0, 80.0, 90.0, 100.0]
+    assert list(ring.window("price", 2)) == [90.0, 100.0]
+    assert ring.last("price") == 100.0
+
+    view = ring.view("price")
+    assert view.flags["C_CONTIGUOUS"]
+    assert list(view) == [70.0, 80.0, 90.0, 100.0]
+    # aliases the ring, no copy
+    ring.append(11, 110.0)
+    assert np.shares_memory(view, ring.view("price"))
+
+
+def test_stats_on_partly_filled_ring():
+    ring = TickRing(8, ("price",))
+    for value in (1.0, 2.0, 3.0):
+        ring.append(value)
+
+    assert len(ring.view("price")) == 3
+    assert ring.mean("price") == 2.0
+    assert abs(ring.std("price") - np.std([1.0, 2.0, 3.0])) < 1e-12
+    # weights 0.25, 0.5, 1 normalized, newest heaviest
+    assert abs(ring.ewma("price", 0.5) - (1 * 0.25 + 2 * 0.5 + 3 * 1) / 1.75) < 1e-12
+
+
+def test_store_converts_string_prices():
+    class Exchange:
+        async def subscribe_many(self, topics, cb):
+            return []
+
+    store = TickStore(capacity=16)
+    asyncio.run(store.track(Exchange(), ["XBTUSDM"], (TICKER, MATCH)))
+    store.on_ticker("message", {
+        "topic": "/contractMarket/ticker:XBTUSDM",
+        "data": {"bestBidPrice": "3200.0", "bestBidSize": 795, "bestAskPrice": "3600.0",
+                 "bestAskSize": 284, "ts": 1553846081210004941}})
+    store.on_match("message", {
+        "topic": "/contractMarket/execution:XBTUSDM",
+        "data": {"side": "sell", "price": "3600.0", "size": 16, "ts": 1553846281766256031}})
+
+    assert store.ring("XBTUSDM", TICKER).last("ask") == 3600.0
+    assert store.ring("XBTUSDM", MATCH).last("side") == -1.0
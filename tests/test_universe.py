@@ -0,0 +1,40 @@
+from market import UniverseTable
+
+
+def _ticker(symbol):
+    return {
+        "topic": "/contractMarket/ticker:%s" % symbol,
+        "subject": "ticker",
+        "data": {"symbol": symbol, "sequence": 45, "side": "sell", "price": "3600.0",
+                 "size": 16, "tradeId": "5c9dcf4170744d6f5a3d32fb",
+                 "bestBidSize": 795, "bestBidPrice": "3200.0",
+                 "bestAskPrice": "3600.0", "bestAskSize": 284,
+                 "ts": 1553846081210004941},
+    }
+
+
+def test_ticker_with_string_prices():
+    table = UniverseTable(["XBTUSDM", "ETHUSDM"])
+    table.on_message("message", _ticker("ETHUSDM"))
+
+    assert table.get("ETHUSDM", "bid") == 3200.0
+    assert table.get("ETHUSDM", "ask") == 3600.0
+    assert table.get("ETHUSDM", "last") == 3600.0
+    assert table.get("ETHUSDM", "ts") == 1553846081210.004941
+    assert list(table.updates) == [0, 1]
+
+
+def test_instrument_and_depth_rows():
+    table = UniverseTable(["XBTUSDM"])
+    table.on_message("message", {
+        "topic": "/contract/instrument:XBTUSDM", "subject": "mark.index.price",
+        "data": {"granularity": 1000, "indexPrice": "4000.23", "markPrice": "4010.52",
+                 "timestamp": 1551770400000}})
+    table.on_message("message", {
+        "topic": "/contractMarket/level2Depth5:XBTUSDM", "subject": "level2",
+        "data": {"bids": [["9000.0", 10], ["8999.5", 3]], "asks": [["9000.5", 7]],
+                 "timestamp": 1551770400000}})
+
+    assert table.get("XBTUSDM", "mark") == 4010.52
+    assert list(table.view("bids")[0][:2]) == [9000.0, 8999.5]
+    assert table.view("ask_sizes")[0][0] == 7
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+
+from const import SCHEDULE_POLL
+from kumex import KuMexExchange
+from strategy.base import StrategyBase
+from tradecore.control import report_latency, schedule_strategies
+from tradecore.worker import MarketDataHub
+
+TOPIC = "/contractMarket/ticker:XBTUSDM"
+
+
+def test_hub_publishes_raw_frame():
+    async def run():
+        hub = MarketDataHub(slots=16, slot_size=512)
+        try:
+            exchange = KuMexExchange("https://api-futures.kucoin.com", "k", "s", "p")
+            exchange.tap = hub._publisher(0, "kumex")
+            hub.exchanges.append(exchange)
+            hub.channels["kumex"] = 0
+            reader = hub.ring.reader()
+            await hub._subscribe(1, "kumex", TOPIC)
+
+            frame = ('{"type":"message","topic":"%s","subject":"ticker",'
+                     '"data":{"sequence":7, "price": "9000.5"}}' % TOPIC)
+            exchange._on_frame(frame)
+            exchange._on_frame('{"type":"message","topic":"/other","data":{}}')
+            return [(channel, bytes(payload)) for channel, payload in reader.read()]
+        finally:
+            await hub.release()
+
+    frame = ('{"type":"message","topic":"%s","subject":"ticker",'
+             '"data":{"sequence":7, "price": "9000.5"}}' % TOPIC)
+    assert asyncio.run(run()) == [(0, frame.encode('utf-8'))]
+
+
+class Counting(StrategyBase):
+
+    def __init__(self):
+        super(Counting, self).__init__()
+        self.runs = 0
+
+    async def analysis(self):
+        self.runs += 1
+
+
+def test_poll_scheduler_executes_without_notify():
+    async def run():
+        strategy = Counting()
+        task = asyncio.ensure_future(schedule_strategies([strategy], SCHEDULE_POLL, 0.01))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        return strategy.runs
+
+    assert asyncio.run(run()) >= 3
+
+
+def test_latency_reported_for_worker_strategies(caplog):
+    async def run():
+        strategy = Counting()
+        runner = asyncio.ensure_future(schedule_strategies([strategy], "event", 0.1))
+        report = asyncio.ensure_future(report_latency([strategy], 0.02, "event worker-0"))
+        strategy.notify()
+        await asyncio.sleep(0.05)
+        report.cancel()
+        await strategy.close()
+        await runner
+        return strategy
+
+    with caplog.at_level(logging.INFO, logger="control"):
+        strategy = asyncio.run(run())
+    assert strategy.decision_latency.count == 1
+    assert any("[event worker-0] tick-to-decision" in record.getMessage()
+               for record in caplog.records)